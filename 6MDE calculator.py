@@ -1,12 +1,159 @@
+import os
+import sys
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from scipy import stats
+import plotly.express as px
+
+# ==============================
+# PATH SETUP
+# ==============================
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(ROOT_DIR, "statistics"))
+
+from MDE_stats import (
+    mde_grid,
+    mde_mean_grid,
+    sample_size_mean,
+    sample_size_proportion,
+)
 
 # ==============================
 #   PAGE CONFIG (WIDE MODE)
 # ==============================
 
 st.set_page_config(layout="wide")
-st.title("MDE calculator")
\ No newline at end of file
+st.title("MDE calculator")
+
+# ==============================
+# INSTELLINGEN
+# ==============================
+st.markdown("### Instellingen")
+
+metric_type = st.radio(
+    "Metric type",
+    ["Conversie (proportie)", "Gemiddelde"],
+    horizontal=True
+)
+
+c1, c2, c3 = st.columns(3)
+
+with c1:
+    if metric_type == "Conversie (proportie)":
+        baseline = st.number_input(
+            "Baseline conversie (%)", min_value=0.01, max_value=99.0, value=5.0
+        ) / 100
+        std = None
+    else:
+        baseline = st.number_input("Baseline gemiddelde", min_value=0.01, value=50.0)
+        std = st.number_input("Standaarddeviatie", min_value=0.0001, value=25.0)
+
+    daily_traffic = st.number_input(
+        "Bezoekers per dag (totaal)", min_value=1, value=10_000, step=1_000
+    )
+
+with c2:
+    alpha = st.select_slider(
+        "Alpha", options=[0.01, 0.025, 0.05, 0.1, 0.2], value=0.05
+    )
+    power = st.select_slider(
+        "Power", options=[0.7, 0.75, 0.8, 0.85, 0.9, 0.95], value=0.8
+    )
+
+with c3:
+    alternative = st.selectbox("Toets", ["two-sided", "one-sided"])
+    allocation = st.slider(
+        "Aandeel verkeer naar variant (%)", min_value=5, max_value=95, value=50
+    ) / 100
+    max_days = st.slider("Looptijd (dagen)", min_value=7, max_value=90, value=28)
+
+days = np.arange(1, max_days + 1)
+
+# Sensitivity axes: row `mid` and traffic column `cur` are the inputs above
+SCALES = np.linspace(0.5, 1.5, 21)
+TRAFFIC_SCALES = np.array([0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 2.0])
+mid, cur = len(SCALES) // 2, 3
+traffic = np.round(daily_traffic * TRAFFIC_SCALES)
+
+# ==============================
+# MDE PER LOOPTIJD
+# ==============================
+if metric_type == "Conversie (proportie)":
+    baselines = baseline * SCALES
+
+    # (baseline, traffic, days, alpha, power) in one call
+    grid = mde_grid(baselines, traffic, days, alpha, power, allocation, alternative)
+    row_labels = [f"{b * 100:.2f}%" for b in baselines]
+    row_title = "Baseline conversie"
+else:
+    stds = std * SCALES
+
+    grid = mde_mean_grid(stds, traffic, days, alpha, power, allocation, alternative, baseline)
+    row_labels = [f"{s:.4g}" for s in stds]
+    row_title = "Standaarddeviatie"
+
+st.markdown("### MDE per looptijd")
+
+summary = pd.DataFrame({
+    "Dagen": days,
+    "Bezoekers": (daily_traffic * days).astype(int),
+    "MDE (relatief %)": np.round(grid[mid, cur, :, 0, 0] * 100, 2),
+})
+
+st.dataframe(
+    summary[summary["Dagen"] % 7 == 0] if max_days >= 14 else summary,
+    use_container_width=True,
+    hide_index=True
+)
+
+# ==============================
+# GEVOELIGHEID (HEATMAPS)
+# ==============================
+st.markdown("### Gevoeligheid")
+
+h1, h2 = st.columns(2)
+
+with h1:
+    fig = px.imshow(
+        grid[:, cur, :, 0, 0] * 100,
+        x=days,
+        y=row_labels,
+        aspect="auto",
+        color_continuous_scale="Viridis_r",
+        labels={"x": "Dagen", "y": row_title, "color": "MDE (%)"},
+        title=f"MDE (%) — {row_title.lower()} × looptijd",
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+with h2:
+    fig = px.imshow(
+        grid[mid, :, :, 0, 0] * 100,
+        x=days,
+        y=[f"{int(t):,}" for t in traffic],
+        aspect="auto",
+        color_continuous_scale="Viridis_r",
+        labels={"x": "Dagen", "y": "Bezoekers per dag", "color": "MDE (%)"},
+        title="MDE (%) — verkeer × looptijd",
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+# ==============================
+# BENODIGDE STEEKPROEF
+# ==============================
+st.markdown("### Benodigde steekproef")
+
+target = st.number_input(
+    "Gewenste MDE (relatief %)", min_value=0.1, value=5.0, step=0.5
+) / 100
+
+if metric_type == "Conversie (proportie)":
+    n_total = sample_size_proportion(baseline, target, alpha, power, allocation, alternative)
+else:
+    n_total = sample_size_mean(std, target, alpha, power, allocation, alternative, baseline)
+
+n_total = int(n_total)
+
+m1, m2, m3 = st.columns(3)
+m1.metric("Totaal bezoekers", f"{n_total:,}")
+m2.metric("Control / Variant", f"{round(n_total * (1 - allocation)):,} / {round(n_total * allocation):,}")
+m3.metric("Dagen nodig", int(np.ceil(n_total / daily_traffic)))
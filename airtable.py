@@ -1,7 +1,17 @@
 # ui_airtable.py
+import os
 import streamlit as st
-from pyairtable import Table
-import requests
+
+from airtable_client import AirtableError, get_client
+from airtable_sync import RecordStore, sync
+
+STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "airtable.sqlite")
+
+@st.cache_resource
+def record_store():
+    # local mirror of the synced tables, shared by every session
+    os.makedirs(os.path.dirname(STORE_PATH), exist_ok=True)
+    return RecordStore(STORE_PATH, name_field="Name")
 
 def airtable_test_ui():
     st.markdown("---")
@@ -40,18 +50,20 @@ def airtable_test_ui():
     # ==============================
     st.subheader("Stap 1: API-token validatie (meta/bases call)")
 
-    test_url = "https://api.airtable.com/v0/meta/bases"
-    headers = {"Authorization": f"Bearer {API_KEY}"}
+    # pooled session + TTL caches, shared by every rerun and session
+    client = get_client(API_KEY)
 
-    resp = requests.get(test_url, headers=headers)
+    refresh = st.button("🔄 Airtable opnieuw ophalen")
+    if refresh:
+        client.invalidate()
 
-    st.write("➡ Status code:", resp.status_code)
-
-    if resp.status_code == 200:
+    try:
+        bases = client.bases()
         st.success("API-token is geldig ✔")
-    else:
+    except AirtableError as e:
+        st.write("➡ Status code:", e.status_code)
         st.error("❌ API-token is ongeldig OF gehinderd door permissies.")
-        st.code(resp.text)
+        st.code(e.text)
         return
 
     # ==============================
@@ -59,7 +71,6 @@ def airtable_test_ui():
     # ==============================
     st.subheader("Stap 2: Base‑toegang controleren")
 
-    bases = resp.json().get("bases", [])
     base_ids = [b["id"] for b in bases]
 
     st.write("📋 Bases waar token toegang toe heeft:")
@@ -77,15 +88,13 @@ def airtable_test_ui():
     # ==============================
     st.subheader("Stap 3: Tabellen ophalen uit Base")
 
-    table_meta_url = f"https://api.airtable.com/v0/meta/bases/{BASE_ID}/tables"
-    table_meta_resp = requests.get(table_meta_url, headers=headers)
-
-    if table_meta_resp.status_code != 200:
+    try:
+        tables = client.tables(BASE_ID)
+    except AirtableError as e:
         st.error("❌ Kan tabellen niet ophalen uit Base.")
-        st.code(table_meta_resp.text)
+        st.code(e.text)
         return
 
-    tables = table_meta_resp.json().get("tables", [])
     table_names = [t["name"] for t in tables]
 
     st.write("📄 Tabellen in deze Base:")
@@ -100,18 +109,30 @@ def airtable_test_ui():
     # ==============================
     # 4. PROBEER RECORDS OP TE HALEN
     # ==============================
-    st.subheader("Stap 4: Records ophalen vanuit Airtable")
+    st.subheader("Stap 4: Records synchroniseren met lokale opslag")
+
+    store = record_store()
 
     try:
-        table = Table(API_KEY, BASE_ID, TABLE_NAME)
-        records = table.all()
-        st.success(f"✔ {len(records)} records opgehaald.")
+        # full load the first time (or on refresh), afterwards only changed records
+        result = sync(client, store, BASE_ID, TABLE_NAME, full=refresh)
     except Exception as e:
         st.error("❌ Records ophalen mislukt.")
         st.code(str(e))
         return
 
-    if not records:
+    total = store.count(BASE_ID, TABLE_NAME)
+
+    if result.skipped:
+        st.success(f"✔ {total} records in lokale opslag (recent gesynchroniseerd).")
+    else:
+        mode = "volledige" if result.full else "incrementele"
+        st.success(
+            f"✔ {total} records in lokale opslag — {mode} sync: "
+            f"{result.fetched} opgehaald, {result.deleted} verwijderd."
+        )
+
+    if not total:
         st.warning("⚠ Geen records gevonden in de tabel.")
         return
 
@@ -120,18 +141,15 @@ def airtable_test_ui():
     # ==============================
     st.subheader("🔽 Selecteer een record op basis van 'Name'")
 
-    names = [r["fields"].get("Name") for r in records if r["fields"].get("Name")]
+    names = store.names(BASE_ID, TABLE_NAME)
 
     if not names:
         st.warning("⚠ Kolom 'Name' niet gevonden in records.")
         st.write("Beschikbare kolommen:")
-        st.json(records[0]["fields"].keys())
+        st.json(list(store.first(BASE_ID, TABLE_NAME)["fields"].keys()))
         return
 
     selected_name = st.selectbox("Naam:", names)
 
-    for rec in records:
-        if rec["fields"].get("Name") == selected_name:
-            st.subheader("📌 Record details")
-            st.json(rec["fields"])
-            break
\ No newline at end of file
+    st.subheader("📌 Record details")
+    st.json(store.get(BASE_ID, TABLE_NAME, selected_name)["fields"])
\ No newline at end of file
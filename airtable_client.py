@@ -0,0 +1,255 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_URL = "https://api.airtable.com/v0"
+
+META_TTL = 300     # seconds; bases and table schemas rarely change
+PAGE_SIZE = 100    # Airtable's maximum page size
+TIMEOUT = 30
+POOL_SIZE = 10
+
+RATE_LIMIT = 5      # requests per second per base
+MAX_RETRIES = 5
+BACKOFF = 1.0       # seconds, doubled per retry unless Retry-After says otherwise
+MAX_BACKOFF = 30.0
+
+
+class AirtableError(Exception):
+    """Non-2xx response from the Airtable API, or no response at all.
+
+    `status_code` is None when the request itself failed (connection
+    error, timeout); `text` then describes that failure.
+    """
+
+    def __init__(self, status_code, text):
+        super().__init__(f"HTTP {status_code}: {text}" if status_code else text)
+        self.status_code = status_code
+        self.text = text
+
+
+def table_path(base_id, table):
+    """API path of a table; names may contain spaces, "/" or "?"."""
+    return f"{base_id}/{quote(table, safe='')}"
+
+
+def retry_delay(retry_after, default):
+    """Seconds to wait for a Retry-After header (seconds or HTTP date)."""
+    if not retry_after:
+        return default
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+# =========================
+# RATE LIMIT
+# =========================
+class TokenBucket:
+    """Thread-safe token bucket: at most `rate` acquisitions per second on average.
+
+    Up to `capacity` tokens can be spent at once; `acquire` blocks until a
+    token is available. The default capacity of 1 spaces requests evenly,
+    so no one-second window ever sees more than `rate` of them.
+    """
+
+    def __init__(self, rate=RATE_LIMIT, capacity=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+
+            self.sleep(wait)
+
+
+# =========================
+# TTL CACHE
+# =========================
+class TTLCache:
+    """Values computed once per key and reused until `ttl` seconds have passed.
+
+    Shared by every thread (Streamlit session) in the process. `compute`
+    runs under a lock of its own key only, so concurrent misses on one key
+    fetch once while other keys are served or fetched in parallel.
+    """
+
+    def __init__(self, ttl, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._values = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, key):
+        hit = self._values.get(key)
+        if hit is not None and self.clock() - hit[0] < self.ttl:
+            return hit
+        return None
+
+    def get(self, key, compute):
+        with self._lock:
+            hit = self._fresh(key)
+            if hit is not None:
+                return hit[1]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have fetched it while we waited
+            with self._lock:
+                hit = self._fresh(key)
+            if hit is not None:
+                return hit[1]
+
+            value = compute()
+            with self._lock:
+                self._values[key] = (self.clock(), value)
+            return value
+
+    def invalidate(self, match=None):
+        """Drop every key for which `match(key)` is true (all keys by default)."""
+        with self._lock:
+            for key in [k for k in self._values if match is None or match(k)]:
+                del self._values[key]
+
+
+# =========================
+# CLIENT
+# =========================
+class AirtableClient:
+    """Airtable data access over one pooled `requests.Session`.
+
+    Meta calls (bases, table schemas) are cached with a TTL; record
+    listings are not (see `airtable_sync` for a local copy). Every request
+    first takes a token from its base's TokenBucket (Airtable allows 5
+    requests per second per base) and 429 responses are retried with
+    exponential backoff, so the client can be shared by several threads.
+    Failed requests, including connection errors and timeouts, raise
+    AirtableError. `api_url` can point at a local stub server for testing.
+    """
+
+    def __init__(
+        self,
+        api_key,
+        api_url=API_URL,
+        session=None,
+        meta_ttl=META_TTL,
+        timeout=TIMEOUT,
+        rate_limit=RATE_LIMIT,
+        sleep=time.sleep,
+    ):
+        self.api_url = api_url.rstrip("/")
+        self.timeout = timeout
+        self.rate_limit = rate_limit
+        self.sleep = sleep
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        session.headers["Authorization"] = f"Bearer {api_key}"
+        self.session = session
+
+        self._meta = TTLCache(meta_ttl)
+        self._limiters = {}
+        self._limiters_lock = threading.Lock()
+
+    def limiter(self, path):
+        """TokenBucket of the base a path belongs to ("meta" for meta calls)."""
+        base = path.split("/", 1)[0]
+        with self._limiters_lock:
+            if base not in self._limiters:
+                self._limiters[base] = TokenBucket(self.rate_limit, sleep=self.sleep)
+            return self._limiters[base]
+
+    def request(self, method, path, params=None, json=None):
+        limiter = self.limiter(path)
+        delay = BACKOFF
+
+        for attempt in range(MAX_RETRIES + 1):
+            limiter.acquire()
+            try:
+                resp = self.session.request(
+                    method, f"{self.api_url}/{path}", params=params, json=json, timeout=self.timeout
+                )
+            except requests.RequestException as e:
+                raise AirtableError(None, f"{type(e).__name__}: {e}") from e
+
+            if resp.status_code != 429 or attempt == MAX_RETRIES:
+                break
+
+            self.sleep(min(retry_delay(resp.headers.get("Retry-After"), delay), MAX_BACKOFF))
+            delay *= 2
+
+        if not resp.ok:
+            raise AirtableError(resp.status_code, resp.text)
+        return resp.json()
+
+    def get(self, path, params=None):
+        return self.request("GET", path, params=params)
+
+    # ---------- meta ----------
+    def bases(self):
+        return self._meta.get(("bases",), lambda: self._paginate("meta/bases", "bases"))
+
+    def tables(self, base_id):
+        return self._meta.get(
+            ("tables", base_id),
+            lambda: self.get(f"meta/bases/{base_id}/tables").get("tables", []),
+        )
+
+    # ---------- records ----------
+    def _paginate(self, path, key, params=None):
+        params = dict(params or {})
+        items = []
+        while True:
+            page = self.get(path, params)
+            items.extend(page.get(key, []))
+            if not page.get("offset"):
+                return items
+            params["offset"] = page["offset"]
+
+    def list_records(self, base_id, table, params=None):
+        """Every page of a (filtered) record listing, uncached.
+
+        `params` are passed to the list endpoint, e.g. `filterByFormula` or
+        `fields[]` (a list, sent as repeated parameters).
+        """
+        return self._paginate(
+            table_path(base_id, table), "records", {"pageSize": PAGE_SIZE, **(params or {})}
+        )
+
+    def invalidate(self):
+        """Forget the cached meta calls (bases, table schemas)."""
+        self._meta.invalidate()
+
+
+@lru_cache(maxsize=None)
+def get_client(api_key, api_url=API_URL):
+    """One client (and connection pool) per API key for the whole process."""
+    return AirtableClient(api_key, api_url)
@@ -0,0 +1,65 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from airtable_client import table_path
+
+BATCH_SIZE = 10   # Airtable's maximum number of records per create/update request
+WORKERS = 5       # in-flight requests; the client's TokenBucket sets the actual rate
+
+
+# =========================
+# CONCURRENT READS
+# =========================
+def fetch_tables(client, sources, workers=WORKERS):
+    """List several tables (or views) at once.
+
+    `sources` maps a name to (base_id, table) or (base_id, table, params),
+    e.g. {"runs": ("app…", "Runs", {"view": "Actief"})}. Pages of one
+    listing follow each other's offset, so the concurrency is across
+    sources; all requests share the client's per-base rate limit.
+    Returns {name: records}.
+    """
+    def fetch(source):
+        base_id, table, *params = source
+        return client.list_records(base_id, table, *params)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(fetch, sources.values())
+        return dict(zip(sources, results))
+
+
+# =========================
+# BATCHED WRITES
+# =========================
+def to_fields(frame):
+    """DataFrame rows as JSON-safe Airtable field dicts (NaN -> empty)."""
+    rows = json.loads(frame.to_json(orient="records", force_ascii=False))
+    return [{k: v for k, v in row.items() if v is not None} for row in rows]
+
+
+def write_records(client, base_id, table, rows, merge_on=None, typecast=True, workers=WORKERS):
+    """Create (or, with `merge_on`, upsert) rows in batches of BATCH_SIZE.
+
+    `rows` are field dicts. With `merge_on` (a list of field names) each
+    batch is a PATCH with `performUpsert`, so pushing the same results
+    again updates the existing records instead of duplicating them. Rows
+    with the same merge fields are collapsed to the last one first:
+    concurrent upserts of one key could otherwise each create a record.
+    Batches are sent concurrently; the client limits them to 5 requests
+    per second and retries 429s. Returns the created/updated records.
+    """
+    if merge_on:
+        rows = list({tuple(r.get(f) for f in merge_on): r for r in rows}.values())
+
+    batches = [rows[i:i + BATCH_SIZE] for i in range(0, len(rows), BATCH_SIZE)]
+
+    def send(batch):
+        body = {"records": [{"fields": fields} for fields in batch], "typecast": typecast}
+        method = "POST"
+        if merge_on:
+            body["performUpsert"] = {"fieldsToMergeOn": list(merge_on)}
+            method = "PATCH"
+        return client.request(method, table_path(base_id, table), json=body)["records"]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return [rec for written in pool.map(send, batches) for rec in written]
@@ -0,0 +1,224 @@
+import json
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+SYNC_INTERVAL = 30              # seconds between incremental syncs
+RECONCILE_INTERVAL = 15 * 60    # seconds between deletion checks
+WATERMARK_SKEW = timedelta(minutes=1)  # overlap against clock skew; upserts are idempotent
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    base TEXT NOT NULL,
+    tbl TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT,
+    created TEXT,
+    fields TEXT NOT NULL,
+    PRIMARY KEY (base, tbl, id)
+);
+CREATE INDEX IF NOT EXISTS records_name ON records (base, tbl, name, created);
+CREATE TABLE IF NOT EXISTS sync_state (
+    base TEXT NOT NULL,
+    tbl TEXT NOT NULL,
+    watermark TEXT,
+    synced_at REAL,
+    reconciled_at REAL,
+    PRIMARY KEY (base, tbl)
+);
+"""
+
+
+# =========================
+# LOCAL STORE
+# =========================
+class RecordStore:
+    """Airtable records mirrored in SQLite, indexed by record id and name.
+
+    Each call opens its own connection, so one store can be shared by
+    every Streamlit session (thread) in the process.
+    """
+
+    def __init__(self, path, name_field="Name"):
+        self.path = path
+        self.name_field = name_field
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # ---------- writes ----------
+    def upsert(self, base, table, records):
+        rows = [
+            (
+                base,
+                table,
+                rec["id"],
+                rec["fields"].get(self.name_field),
+                rec.get("createdTime"),
+                json.dumps(rec["fields"]),
+            )
+            for rec in records
+        ]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def keep_only(self, base, table, ids):
+        """Delete local records whose id is not in `ids`; returns how many."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TEMP TABLE live (id TEXT PRIMARY KEY)")
+            conn.executemany("INSERT OR IGNORE INTO live VALUES (?)", [(i,) for i in ids])
+            cur = conn.execute(
+                "DELETE FROM records WHERE base = ? AND tbl = ? "
+                "AND id NOT IN (SELECT id FROM live)",
+                (base, table),
+            )
+        return cur.rowcount
+
+    def state(self, base, table):
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT watermark, synced_at, reconciled_at FROM sync_state "
+                "WHERE base = ? AND tbl = ?",
+                (base, table),
+            ).fetchone()
+        return row or (None, None, None)
+
+    def set_state(self, base, table, watermark, synced_at, reconciled_at):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?, ?)",
+                (base, table, watermark, synced_at, reconciled_at),
+            )
+
+    # ---------- reads ----------
+    def count(self, base, table):
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM records WHERE base = ? AND tbl = ?", (base, table)
+            ).fetchone()[0]
+
+    def names(self, base, table):
+        """Distinct names in creation order."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT name FROM records WHERE base = ? AND tbl = ? AND name IS NOT NULL "
+                "AND name != '' GROUP BY name ORDER BY MIN(created), MIN(id)",
+                (base, table),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def _record(self, row):
+        if row is None:
+            return None
+        return {"id": row[0], "createdTime": row[1], "fields": json.loads(row[2])}
+
+    def get(self, base, table, name):
+        """Oldest record with this name, via the name index."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, created, fields FROM records WHERE base = ? AND tbl = ? "
+                "AND name = ? ORDER BY created, id LIMIT 1",
+                (base, table, name),
+            ).fetchone()
+        return self._record(row)
+
+    def first(self, base, table):
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, created, fields FROM records WHERE base = ? AND tbl = ? LIMIT 1",
+                (base, table),
+            ).fetchone()
+        return self._record(row)
+
+
+# =========================
+# SYNC
+# =========================
+@dataclass
+class SyncResult:
+    full: bool
+    fetched: int
+    deleted: int
+    skipped: bool = False
+
+
+def _formula_after(watermark):
+    return f"IS_AFTER(LAST_MODIFIED_TIME(), DATETIME_PARSE('{watermark}'))"
+
+
+def _id_params(client, base, table):
+    """List params that keep a deletion check small.
+
+    Only the table's primary field is requested, by id, as it exists in
+    every table (a "Name" column need not). Without a schema match the
+    full records are listed; Airtable rejects unknown fields with a 422.
+    """
+    for schema in client.tables(base):
+        if table in (schema.get("name"), schema.get("id")) and schema.get("primaryFieldId"):
+            return {"fields[]": [schema["primaryFieldId"]]}
+    return {}
+
+
+def sync(
+    client,
+    store,
+    base,
+    table,
+    full=False,
+    min_interval=SYNC_INTERVAL,
+    reconcile_interval=RECONCILE_INTERVAL,
+):
+    """Bring the local store of one table up to date.
+
+    The first sync (or `full=True`) downloads every record. Later syncs
+    only fetch records modified after the stored watermark, using a
+    `filterByFormula` on LAST_MODIFIED_TIME(). Deleted records never show
+    up in that filter, so every `reconcile_interval` seconds the record
+    ids are listed (with only the primary field, to keep pages small) and
+    local records missing from Airtable are removed. Syncs closer together
+    than `min_interval` seconds are skipped.
+    """
+    watermark, synced_at, reconciled_at = store.state(base, table)
+    now = time.time()
+    full = full or watermark is None
+
+    if not full and synced_at is not None and now - synced_at < min_interval:
+        return SyncResult(full=False, fetched=0, deleted=0, skipped=True)
+
+    started = datetime.now(timezone.utc) - WATERMARK_SKEW
+    deleted = 0
+
+    if full:
+        records = client.list_records(base, table)
+        store.upsert(base, table, records)
+        deleted = store.keep_only(base, table, [r["id"] for r in records])
+        reconciled_at = now
+    else:
+        records = client.list_records(
+            base, table, {"filterByFormula": _formula_after(watermark)}
+        )
+        store.upsert(base, table, records)
+
+        if reconciled_at is None or now - reconciled_at >= reconcile_interval:
+            ids = client.list_records(base, table, _id_params(client, base, table))
+            deleted = store.keep_only(base, table, [r["id"] for r in ids])
+            reconciled_at = now
+
+    store.set_state(
+        base,
+        table,
+        started.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        now,
+        reconciled_at,
+    )
+
+    return SyncResult(full=full, fetched=len(records), deleted=deleted)
@@ -0,0 +1,314 @@
+import os
+import re
+import sys
+import streamlit as st
+
+# ==============================
+# PATH SETUP
+# ==============================
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(ROOT_DIR, "statistics"))
+sys.path.append(os.path.join(ROOT_DIR, "data"))
+
+from analysis_cache import AnalysisCache
+from ingestion import read_header
+from dataset_cache import file_hash, load_dataset
+from numeric_parsing import fix_columns, parse_numeric
+from column_profile import ProfileCache
+from variant_index import VariantIndex
+from airtable_client import AirtableError, get_client
+from airtable_io import to_fields, write_records
+from results_store import ResultsStore
+
+RESULTS_DIR = os.path.join(ROOT_DIR, ".cache", "results")
+
+# Results pushed again update the Airtable row of the same comparison;
+# only the fields a table has are used (the Bayesian table has no zero-mode)
+MERGE_ON = ["Metric","Control","Variant","Nullen","Bootstrap"]
+
+# Upload, column check and variant indexing shared by the calculator pages.
+# The loaded dataset lives in session state, so it carries over between pages.
+
+# ==============================
+# SESSION STATE
+# ==============================
+def init_state():
+    defaults = {
+        "df":None,
+        "transform_log":{},
+        "rank_engines":{},
+        "variant_indexes":{},
+        "load_key":None,
+        "aggregates":None,
+        "digests":{},
+        "dataset_hash":None
+    }
+
+    for key,value in defaults.items():
+        if key not in st.session_state:
+            st.session_state[key]=value
+
+# ==============================
+# HELPERS
+# ==============================
+def format_rows(n):
+    if n >= 1_000_000:
+        return f"{round(n/1_000_000)}M"
+    if n >= 1_000:
+        return f"{round(n/1_000)}K"
+    return str(n)
+
+@st.cache_resource
+def profile_cache():
+    # shared by all sessions; keys include the dataset hash and fix state
+    return ProfileCache()
+
+@st.cache_resource
+def analysis_cache():
+    # shared by all sessions; keys include the dataset hash and fix state
+    return AnalysisCache()
+
+def upload_hash(file):
+    # content hash, computed once per upload
+    key=(file.name,file.size,getattr(file,"file_id",None))
+
+    if key not in st.session_state.digests:
+        st.session_state.digests[key]=file_hash(file)
+
+    return st.session_state.digests[key]
+
+def metric_key(metric_col):
+    return (metric_col,st.session_state.transform_log.get(metric_col))
+
+def variant_index(df,variant_col):
+    # factorized once per (dataset, variant column, fix state)
+    key=(
+        st.session_state.dataset_hash,
+        variant_col,
+        st.session_state.transform_log.get(variant_col)
+    )
+
+    if key not in st.session_state.variant_indexes:
+        st.session_state.variant_indexes[key]=VariantIndex(df[variant_col])
+
+    return st.session_state.variant_indexes[key]
+
+def results_store(state_key,page):
+    # in memory for this session only, unless the user saves the tables under a name
+    name=st.sidebar.text_input(
+        "Resultaten bewaren als",
+        key=f"{state_key}_name",
+        help="Leeg: de tabellen horen alleen bij deze sessie. "
+             "Met een naam worden ze bewaard en na herladen opnieuw ingelezen."
+    ).strip()
+
+    path=None
+    if name:
+        path=os.path.join(RESULTS_DIR,page,re.sub(r"[^\w-]+","_",name)+".jsonl")
+
+    store=st.session_state.get(state_key)
+
+    if store is None or store.path!=path:
+        loaded=ResultsStore.load(path)
+
+        # a new name saves the tables of this session; clearing the name
+        # keeps them in memory instead of emptying the page
+        if store is not None and (path is None or not os.path.exists(path)):
+            for kind,records in store.records.items():
+                if records:
+                    loaded.add(kind,records)
+
+        st.session_state[state_key]=loaded
+
+    return st.session_state[state_key]
+
+# ==============================
+# KOLOMMEN LADEN (CHUNKED)
+# ==============================
+def load_upload(file):
+    """Select and load the columns of an upload; returns the DataFrame."""
+    header=read_header(file)
+
+    l1,l2 = st.columns([1,3])
+
+    with l1:
+        load_variant=st.selectbox("Variant kolom (laden)",header)
+
+    with l2:
+        load_metrics=st.multiselect(
+            "Kolommen laden",
+            [c for c in header if c!=load_variant],
+            default=[c for c in header if c!=load_variant]
+        )
+
+    digest=upload_hash(file)
+
+    load_key=(digest,load_variant,tuple(load_metrics))
+
+    if st.session_state.df is None or st.session_state.load_key!=load_key:
+
+        progress=st.progress(0.0,text="CSV inlezen…")
+        live=st.empty()
+
+        def on_chunk(rows,fraction,aggregates):
+            progress.progress(fraction,text=f"{format_rows(rows)} rijen ingelezen…")
+            live.dataframe(aggregates,use_container_width=True)
+
+        # parsed once per file content; later sessions memory-map the cached columns
+        data=load_dataset(file,digest,load_variant,load_metrics,on_chunk=on_chunk)
+
+        st.session_state.df=data.df
+        st.session_state.dataset_hash=digest
+        st.session_state.aggregates=data.aggregates
+        st.session_state.load_key=load_key
+        st.session_state.transform_log={}
+        st.session_state.rank_engines={}
+        st.session_state.variant_indexes={}
+
+        progress.empty()
+        live.empty()
+
+    df=st.session_state.df
+
+    st.caption(f"{format_rows(len(df))} rows")
+
+    with st.expander("Per variant (tijdens inlezen berekend)"):
+        st.dataframe(st.session_state.aggregates,use_container_width=True)
+
+        # same count/sum/sum_sq columns the Geaggregeerde Calculator reads
+        st.download_button(
+            "Download als CSV",
+            st.session_state.aggregates.to_csv(),
+            file_name="aggregates.csv",
+            mime="text/csv"
+        )
+
+    return df
+
+# ==============================
+# KOLOMCONTROLE
+# ==============================
+def column_check(df):
+    """Type per column with "Fix" buttons; returns the (possibly fixed) DataFrame."""
+    st.markdown("### Kolomcontrole")
+
+    box = st.container(border=True)
+
+    with box:
+
+        h1,h2,h3,h4 = st.columns([3,2,1.5,5])
+
+        h1.markdown("**Kolom**")
+        h2.markdown("**Type**")
+        h3.markdown("**Fix**")
+        h4.markdown("**Status**")
+
+        profiles=profile_cache().profiles(
+            st.session_state.dataset_hash,
+            df,
+            st.session_state.transform_log
+        )
+
+        pending=[
+            c for c,p in profiles.items()
+            if c not in st.session_state.transform_log and p.transformable
+        ]
+
+        if len(pending)>1 and st.button(f"Alles fixen ({len(pending)} kolommen)"):
+
+            df,changes=fix_columns(df,pending)
+            st.session_state.df=df
+            st.session_state.transform_log.update(changes)
+
+            for c in changes:
+                analysis_cache().invalidate(st.session_state.dataset_hash,c)
+
+            st.rerun()
+
+        for col in df.columns:
+
+            c1,c2,c3,c4 = st.columns([3,2,1.5,5])
+
+            profile = profiles[col]
+
+            c1.write(col)
+
+            c2.write(profile.conclusion)
+
+            transformed = col in st.session_state.transform_log
+
+            if profile.transformable:
+
+                if c3.button(
+                    "Fix",
+                    key=f"transform_{col}",
+                    disabled=transformed
+                ):
+
+                    new_col,changed = parse_numeric(df[col])
+
+                    df[col]=new_col
+                    st.session_state.df=df
+
+                    st.session_state.transform_log[col]=changed
+                    analysis_cache().invalidate(st.session_state.dataset_hash,col)
+
+                    st.rerun()
+
+            if col in st.session_state.transform_log:
+
+                changed = st.session_state.transform_log[col]
+
+                c4.markdown(
+                    f"""
+                    ✅ {changed} values aangepast  
+                    total: {profile.total}  
+                    zeros: {profile.zeros}  
+                    """
+                )
+
+    return df
+
+# ==============================
+# NAAR AIRTABLE
+# ==============================
+def push_results(frame,key):
+    """Write a results table to Airtable in batches of 10 records."""
+    with st.expander("Resultaten naar Airtable"):
+
+        try:
+            api_key=st.secrets["AIRTABLE_API_KEY"]
+            base_id=st.secrets["AIRTABLE_BASE_ID"]
+            default_table=st.secrets.get("AIRTABLE_RESULTS_TABLE","Resultaten")
+        except Exception:
+            st.info("Airtable secrets ontbreken (AIRTABLE_API_KEY / AIRTABLE_BASE_ID).")
+            return
+
+        table=st.text_input("Airtable tabel",default_table,key=f"airtable_table_{key}")
+
+        merge_on=[c for c in MERGE_ON if c in frame.columns]
+
+        upsert=st.checkbox(
+            f"Bestaande rijen bijwerken ({', '.join(merge_on)})",
+            value=True,
+            key=f"airtable_upsert_{key}"
+        )
+
+        if st.button(
+            f"{len(frame)} rijen versturen",
+            key=f"airtable_push_{key}",
+            disabled=frame.empty
+        ):
+
+            try:
+                written=write_records(
+                    get_client(api_key),
+                    base_id,
+                    table,
+                    to_fields(frame),
+                    merge_on=merge_on if upsert else None
+                )
+                st.success(f"✔ {len(written)} rijen weggeschreven naar '{table}'.")
+            except AirtableError as e:
+                st.error("❌ Wegschrijven naar Airtable mislukt.")
+                st.code(e.text)
@@ -0,0 +1,117 @@
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Text values containing currency signs or separators can be parsed by "Fix"
+TRANSFORMABLE = re.compile(r"[€$£]|,|\.")
+TRANSFORM_SAMPLE = 50
+
+QUANTILES = (0.0, 0.25, 0.5, 0.75, 1.0)
+
+
+# =========================
+# PROFILE
+# =========================
+@dataclass(frozen=True)
+class ColumnProfile:
+    dtype: str
+    conclusion: str
+    transformable: bool
+    total: int
+    nans: int
+    zeros: int
+    quantiles: tuple = None  # min, q25, median, q75, max (numeric columns)
+
+
+def column_conclusion(series):
+    if pd.api.types.is_integer_dtype(series):
+        return "✅ integer"
+    if pd.api.types.is_float_dtype(series):
+        return "✅ float"
+    return f"❌ {series.dtype}"
+
+
+def needs_transformation(series):
+    if pd.api.types.is_numeric_dtype(series):
+        return False
+
+    sample = series.dropna().astype(str).head(TRANSFORM_SAMPLE)
+    return any(TRANSFORMABLE.search(v) for v in sample)
+
+
+def profile_column(series):
+    """dtype, transformability, NaN/zero counts and quantiles in one go."""
+    total = len(series)
+
+    if not pd.api.types.is_numeric_dtype(series):
+        return ColumnProfile(
+            dtype=str(series.dtype),
+            conclusion=column_conclusion(series),
+            transformable=needs_transformation(series),
+            total=total,
+            nans=int(series.isna().sum()),
+            zeros=0,
+        )
+
+    values = series.to_numpy(dtype=float, na_value=np.nan)
+    valid = values[~np.isnan(values)]
+
+    return ColumnProfile(
+        dtype=str(series.dtype),
+        conclusion=column_conclusion(series),
+        transformable=False,
+        total=total,
+        nans=total - valid.size,
+        zeros=int(np.count_nonzero(valid == 0)),
+        quantiles=tuple(float(q) for q in np.quantile(valid, QUANTILES)) if valid.size else None,
+    )
+
+
+# =========================
+# CACHE
+# =========================
+class ProfileCache:
+    """Column profiles keyed by (dataset hash, column, dtype, transform state).
+
+    A column is profiled again only when its key changes, e.g. after "Fix"
+    updates its transform state; all other columns are served from the
+    cache. The dtype is part of the key because the transform log can be
+    reset while the fixed (numeric) column stays in the DataFrame. Least
+    recently used entries are dropped beyond `max_entries`. The cache is
+    shared by every session (thread); entries are guarded by a lock and a
+    missing profile is computed outside it.
+    """
+
+    def __init__(self, max_entries=10_000):
+        self.max_entries = max_entries
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, dataset_hash, column, transform_state, series):
+        key = (dataset_hash, column, str(series.dtype), transform_state)
+
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is not None:
+                self._profiles.move_to_end(key)
+                return profile
+
+        profile = profile_column(series)
+
+        with self._lock:
+            self._profiles[key] = profile
+            while len(self._profiles) > self.max_entries:
+                self._profiles.popitem(last=False)
+
+        return profile
+
+    def profiles(self, dataset_hash, df, transform_log):
+        """Profiles of all columns of `df`, computing only the uncached ones."""
+        return {
+            col: self.get(dataset_hash, col, transform_log.get(col), df[col])
+            for col in df.columns
+        }
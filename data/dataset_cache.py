@@ -0,0 +1,258 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ingestion import IngestedData, ingest_csv, tidy_aggregates
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(ROOT_DIR, ".cache", "datasets")
+
+HASH_BLOCK = 8 << 20
+
+# Datasets unused for longer than MAX_AGE are evicted, then the least
+# recently used ones until the cache fits in MAX_CACHE_BYTES.
+MAX_CACHE_BYTES = 20 << 30
+MAX_AGE = 14 * 24 * 3600  # seconds
+
+
+# =========================
+# CONTENT HASH
+# =========================
+def file_hash(file):
+    """blake2b digest of an upload's bytes, read in fixed-size blocks."""
+    digest = hashlib.blake2b(digest_size=16)
+    file.seek(0)
+    for block in iter(lambda: file.read(HASH_BLOCK), b""):
+        digest.update(block)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+# =========================
+# COLUMN STORE
+# =========================
+# .cache/datasets/<hash>/
+#     meta.json                  column key -> file(s) and kind
+#     col_<key hash>.npy            float32 values, or category codes
+#     col_<key hash>.categories.npy category labels
+#     aggregates/<variant>.csv   per-variant aggregates for that variant column
+def _dataset_dir(digest):
+    return os.path.join(CACHE_DIR, digest)
+
+
+def _read_meta(digest):
+    path = os.path.join(_dataset_dir(digest), "meta.json")
+    if not os.path.exists(path):
+        return {"rows": None, "columns": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_meta(digest, meta):
+    path = os.path.join(_dataset_dir(digest), "meta.json")
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, path)
+
+
+def _key(col, variant_col=None):
+    # A variant column is stored as labels, separately from the same column
+    # parsed as a metric
+    return f"variant:{col}" if col == variant_col else f"metric:{col}"
+
+
+def _file_name(key):
+    # Derived from the column key, so sessions writing different columns
+    # of one dataset at the same time never share a file
+    return "col_" + hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+
+def _save_array(path, values):
+    # Written under a temporary name, so a reader never maps a partial file
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, values)
+    os.replace(tmp, path)
+
+
+def save_columns(digest, df, variant_col=None):
+    """Write every column of `df` that is not cached yet as .npy files."""
+    folder = _dataset_dir(digest)
+    os.makedirs(folder, exist_ok=True)
+    cached = _read_meta(digest)["columns"]
+
+    entries = {}
+    for col in df.columns:
+        key = _key(col, variant_col)
+        if key in cached:
+            continue
+
+        name = _file_name(key)
+        s = df[col]
+
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            _save_array(os.path.join(folder, f"{name}.npy"), s.cat.codes.to_numpy())
+            _save_array(
+                os.path.join(folder, f"{name}.categories.npy"),
+                s.cat.categories.astype(str).to_numpy(dtype=str),
+            )
+            entries[key] = {"file": name, "kind": "category"}
+        else:
+            _save_array(os.path.join(folder, f"{name}.npy"), s.to_numpy())
+            entries[key] = {"file": name, "kind": "numeric"}
+
+    # Re-read just before writing, so entries another session added meanwhile are kept
+    meta = _read_meta(digest)
+    meta["rows"] = len(df)
+    meta["columns"].update(entries)
+    _write_meta(digest, meta)
+
+
+def load_columns(digest, columns, variant_col=None):
+    """Memory-map cached columns; numeric columns are zero-copy views."""
+    folder = _dataset_dir(digest)
+    meta = _read_meta(digest)["columns"]
+
+    data = {}
+    for col in columns:
+        entry = meta[_key(col, variant_col)]
+        values = np.load(os.path.join(folder, f"{entry['file']}.npy"), mmap_mode="r")
+
+        if entry["kind"] == "category":
+            categories = np.load(os.path.join(folder, f"{entry['file']}.categories.npy"))
+            data[col] = pd.Categorical.from_codes(values, categories)
+        else:
+            data[col] = values
+
+    return pd.DataFrame(data, copy=False)
+
+
+# =========================
+# AGGREGATES
+# =========================
+def _aggregates_path(digest, variant_col):
+    name = hashlib.blake2b(variant_col.encode(), digest_size=8).hexdigest()
+    return os.path.join(_dataset_dir(digest), "aggregates", f"{name}.csv")
+
+
+def load_aggregates(digest, variant_col):
+    """Cached aggregates for this variant column, or None when there are none."""
+    path = _aggregates_path(digest, variant_col)
+    if not os.path.exists(path):
+        return None
+    aggregates = pd.read_csv(path, index_col=[0, 1], dtype={"variant": str})
+    return aggregates.rename_axis(["variant", "metric"])
+
+
+def save_aggregates(digest, variant_col, aggregates):
+    # No numeric metric was read (e.g. only text columns): nothing to add
+    if aggregates is None or aggregates.empty:
+        return
+
+    path = _aggregates_path(digest, variant_col)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    existing = load_aggregates(digest, variant_col)
+    if existing is not None:
+        aggregates = pd.concat([existing, aggregates])
+        aggregates = aggregates[~aggregates.index.duplicated(keep="last")]
+
+    aggregates.to_csv(path)
+
+
+# =========================
+# EVICTION
+# =========================
+def _folder_size(folder):
+    total = 0
+    for path, _, files in os.walk(folder):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(path, name))
+            except OSError:
+                pass
+    return total
+
+
+def evict(keep=None, max_bytes=MAX_CACHE_BYTES, max_age=MAX_AGE):
+    """Remove cached datasets that are too old, then the least recently used
+    until the cache fits in `max_bytes`. The dataset `keep` is never removed.
+
+    A dataset's folder mtime is its last use (see `load_dataset`).
+    Returns the digests that were removed.
+    """
+    if not os.path.isdir(CACHE_DIR):
+        return []
+
+    now = time.time()
+    entries = []
+    for digest in os.listdir(CACHE_DIR):
+        folder = _dataset_dir(digest)
+        if digest == keep or not os.path.isdir(folder):
+            continue
+        entries.append((os.path.getmtime(folder), _folder_size(folder), digest))
+
+    total = sum(size for _, size, _ in entries)
+    if keep is not None:
+        total += _folder_size(_dataset_dir(keep))
+
+    removed = []
+    for used, size, digest in sorted(entries):
+        if now - used <= max_age and total <= max_bytes:
+            break
+        # Open memory maps stay valid after the files are unlinked
+        shutil.rmtree(_dataset_dir(digest), ignore_errors=True)
+        total -= size
+        removed.append(digest)
+
+    return removed
+
+
+# =========================
+# LOAD WITH CACHE
+# =========================
+def load_dataset(file, digest, variant_col, metric_cols, on_chunk=None):
+    """Selected columns of an upload, served from the on-disk column cache.
+
+    Only columns that are not cached yet are parsed from the CSV (chunked,
+    via `ingest_csv`) and written to the cache; the returned frame is
+    always memory-mapped from disk, so re-opening the same file in any
+    session skips CSV parsing entirely.
+    """
+    columns = [variant_col, *[c for c in metric_cols if c != variant_col]]
+    meta = _read_meta(digest)["columns"]
+    aggregates = load_aggregates(digest, variant_col)
+    if aggregates is None:
+        aggregates = tidy_aggregates(None)
+    aggregated = set(aggregates.index.get_level_values("metric"))
+
+    # Uncached columns, plus cached numeric ones without aggregates for this variant column
+    to_read = []
+    for c in columns[1:]:
+        entry = meta.get(_key(c))
+        if entry is None or (entry["kind"] == "numeric" and c not in aggregated):
+            to_read.append(c)
+
+    if to_read or _key(variant_col, variant_col) not in meta:
+        data = ingest_csv(file, variant_col, to_read, on_chunk=on_chunk)
+        save_columns(digest, data.df, variant_col)
+        save_aggregates(digest, variant_col, data.aggregates)
+        aggregates = load_aggregates(digest, variant_col)
+        if aggregates is None:
+            aggregates = tidy_aggregates(None)
+
+    # Mark as recently used, then bound the cache around it
+    os.utime(_dataset_dir(digest))
+    evict(keep=digest)
+
+    df = load_columns(digest, columns, variant_col)
+    metrics = aggregates.index.get_level_values("metric").isin(metric_cols)
+
+    return IngestedData(df=df, aggregates=aggregates[metrics], rows=len(df))
@@ -0,0 +1,118 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objects as go
+
+LINEAR = "linear"
+LOG = "log"
+CLIP = "clip"  # quantile-clipped range
+
+CLIP_QUANTILES = (0.01, 0.99)
+
+
+# =========================
+# BINNING
+# =========================
+def shared_edges(a, b, bins=100, scale=LINEAR, clip=CLIP_QUANTILES):
+    """Bin edges shared by both arms, so their counts are comparable."""
+    arms = [np.asarray(x, dtype=float) for x in (a, b)]
+    arms = [x[np.isfinite(x)] for x in arms if x.size]
+    if not arms:
+        return np.linspace(0, 1, bins + 1)
+
+    if scale == CLIP:
+        lo = min(np.quantile(x, clip[0]) for x in arms)
+        hi = max(np.quantile(x, clip[1]) for x in arms)
+    else:
+        lo = min(x.min() for x in arms)
+        hi = max(x.max() for x in arms)
+
+    if scale == LOG:
+        positive = [x[x > 0] for x in arms]
+        positive = [x for x in positive if x.size]
+        if positive:
+            lo = min(x.min() for x in positive)
+            if hi > lo:
+                return np.geomspace(lo, hi, bins + 1)
+
+    if hi <= lo:
+        hi = lo + 1
+    return np.linspace(lo, hi, bins + 1)
+
+
+def binned_histograms(a, b, bins=100, scale=LINEAR):
+    """Counts of both arms on shared edges, plus values outside the edges."""
+    edges = shared_edges(a, b, bins, scale)
+    result = {"edges": edges, "scale": scale}
+
+    for name, x in (("a", a), ("b", b)):
+        x = np.asarray(x, dtype=float)
+        counts, _ = np.histogram(x, edges)
+        result[f"counts_{name}"] = counts
+        result[f"outside_{name}"] = int(np.count_nonzero(np.isfinite(x))) - int(counts.sum())
+
+    return result
+
+
+# =========================
+# CACHE
+# =========================
+class HistogramCache:
+    """Binned histograms keyed by (arms, metric, zero-mode, bins, scale).
+
+    `a` and `b` may be callables returning the arms, so a cache hit does
+    not build them. Shared by every session (thread): entries are guarded
+    by a lock and a missing histogram is binned outside it.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._hists = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, a, b, bins=100, scale=LINEAR):
+        key = (*key, bins, scale)
+
+        with self._lock:
+            hist = self._hists.get(key)
+            if hist is not None:
+                self._hists.move_to_end(key)
+                return hist
+
+        a, b = (x() if callable(x) else x for x in (a, b))
+        hist = binned_histograms(a, b, bins, scale)
+
+        with self._lock:
+            self._hists[key] = hist
+            while len(self._hists) > self.max_entries:
+                self._hists.popitem(last=False)
+
+        return hist
+
+
+# =========================
+# RENDER
+# =========================
+def histogram_figure(hist, label, names=("Control", "Variant")):
+    """Overlayed bar chart built from the binned counts only."""
+    edges = hist["edges"]
+    centers = (edges[:-1] + edges[1:]) / 2
+    widths = np.diff(edges)
+
+    fig = go.Figure()
+    for name, counts in zip(names, (hist["counts_a"], hist["counts_b"])):
+        fig.add_trace(go.Bar(x=centers, y=counts, width=widths, name=name, opacity=0.6))
+
+    fig.update_layout(
+        barmode="overlay",
+        title="Raw distribution",
+        xaxis_title=label,
+        yaxis_title="Aantal",
+        height=350,
+        margin=dict(l=10, r=10, t=40, b=10),
+    )
+    if hist["scale"] == LOG:
+        fig.update_xaxes(type="log")
+
+    return fig
@@ -0,0 +1,155 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, union_categoricals
+
+CHUNK_ROWS = 500_000
+
+AGGREGATES = ["count", "nans", "zeros", "sum", "sum_sq"]
+
+
+# =========================
+# HEADER
+# =========================
+def read_header(file):
+    """Column names of a CSV upload without reading its rows."""
+    file.seek(0)
+    columns = pd.read_csv(file, nrows=0).columns.tolist()
+    file.seek(0)
+    return columns
+
+
+# =========================
+# CHUNKED INGESTION
+# =========================
+@dataclass
+class IngestedData:
+    df: pd.DataFrame
+    aggregates: pd.DataFrame  # (variant, metric) x AGGREGATES
+    rows: int
+
+
+def downcast(chunk, variant_col):
+    """float32 for numeric columns, categorical for the variant and text columns."""
+    out = {}
+    for col in chunk.columns:
+        s = chunk[col]
+        if is_numeric_dtype(s) and col != variant_col:
+            out[col] = s.astype(np.float32)
+        else:
+            out[col] = s.astype("category")
+    return pd.DataFrame(out, index=chunk.index)
+
+
+def chunk_aggregates(chunk, variant_col, metrics):
+    """Per-variant running aggregates of the numeric metric columns of one chunk."""
+    x = chunk[metrics].astype(np.float64)
+    parts = pd.concat(
+        {
+            "count": x.notna(),
+            "nans": x.isna(),
+            "zeros": x.eq(0),
+            "sum": x,
+            "sum_sq": x * x,
+        },
+        axis=1,
+    )
+    return parts.groupby(chunk[variant_col], observed=True).sum()
+
+
+def tidy_aggregates(running):
+    """(variant x (aggregate, metric)) -> rows per (variant, metric)."""
+    if running is None or running.empty:
+        index = pd.MultiIndex.from_arrays([[], []], names=["variant", "metric"])
+        return pd.DataFrame(columns=AGGREGATES, index=index, dtype=np.float64)
+    tidy = running.stack(level=1, future_stack=True)[AGGREGATES]
+    tidy.index.names = ["variant", "metric"]
+    return tidy
+
+
+def _concat(chunks):
+    # Categories differ per chunk; union them so the columns stay categorical
+    columns = {}
+    for col in chunks[0].columns:
+        parts = [c[col] for c in chunks]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            columns[col] = pd.Series(union_categoricals(parts, ignore_order=True))
+        else:
+            columns[col] = pd.Series(np.concatenate([p.to_numpy() for p in parts]))
+    return pd.DataFrame(columns)
+
+
+def _read_text(file, variant_col, columns, chunk_rows):
+    """Columns re-read as text (categorical), exactly as they appear in the file."""
+    file.seek(0)
+    reader = pd.read_csv(file, usecols=columns, dtype=str, chunksize=chunk_rows)
+    chunks = [chunk.astype("category") for chunk in reader]
+    return _concat(chunks) if chunks else pd.DataFrame(columns=columns)
+
+
+def ingest_csv(file, variant_col, metric_cols, chunk_rows=CHUNK_ROWS, on_chunk=None):
+    """Read only the selected columns of a CSV upload, chunk by chunk.
+
+    Each chunk is downcast before it is kept, so peak memory is one raw
+    chunk plus the compact columns read so far. Per-variant aggregates of
+    the numeric metrics are updated per chunk and passed to
+    `on_chunk(rows, fraction, aggregates)`, which lets the page show
+    progress and running totals while the file is still loading.
+
+    pandas infers dtypes per chunk, so a column can parse as numeric in
+    one chunk and as text in another. Such a column is a text column: it
+    gets no aggregates and is re-read as text after the pass, so its
+    original strings are kept for "Fix".
+    """
+    usecols = [variant_col, *[c for c in metric_cols if c != variant_col]]
+    size = getattr(file, "size", None)
+
+    file.seek(0)
+    reader = pd.read_csv(file, usecols=usecols, chunksize=chunk_rows)
+
+    chunks = []
+    running = None
+    rows = 0
+    kinds = {}     # column -> numeric in the first chunk
+    mixed = set()  # columns whose kind differs between chunks
+
+    for chunk in reader:
+        chunk[variant_col] = chunk[variant_col].astype(str)
+
+        for c in usecols[1:]:
+            kind = is_numeric_dtype(chunk[c])
+            if kinds.setdefault(c, kind) != kind:
+                mixed.add(c)
+
+        # Aggregates come from the full-precision chunk, before downcasting
+        numeric = [c for c in usecols[1:] if kinds[c] and c not in mixed]
+        if numeric:
+            part = chunk_aggregates(chunk, variant_col, numeric)
+            running = part if running is None else running.add(part, fill_value=0)
+
+        chunks.append(downcast(chunk.drop(columns=list(mixed)), variant_col))
+        rows += len(chunk)
+
+        if on_chunk is not None:
+            fraction = file.tell() / size if size else 0.0
+            on_chunk(rows, min(fraction, 1.0), tidy_aggregates(running))
+
+    if mixed:
+        # Drop what earlier chunks kept or aggregated as numbers
+        chunks = [c.drop(columns=list(mixed), errors="ignore") for c in chunks]
+        if running is not None:
+            running = running.drop(columns=list(mixed), level=1, errors="ignore")
+
+    if chunks:
+        df = _concat(chunks)
+    else:
+        df = pd.DataFrame(columns=[c for c in usecols if c not in mixed])
+
+    if mixed:
+        text = _read_text(file, variant_col, sorted(mixed), chunk_rows)
+        df = pd.concat([df, text], axis=1)[usecols]
+
+    file.seek(0)
+
+    return IngestedData(df=df, aggregates=tidy_aggregates(running), rows=rows)
@@ -0,0 +1,126 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+EU = "eu"  # 1.234,56
+US = "us"  # 1,234.56
+
+SAMPLE_SIZE = 200
+
+_STRIP = "€$£ \u00a0"
+
+# One translate table per locale: drop currency/whitespace/thousands,
+# map the decimal separator to "."
+TABLES = {
+    EU: str.maketrans({**dict.fromkeys(_STRIP + ".", None), ",": "."}),
+    US: str.maketrans(dict.fromkeys(_STRIP + ",", None)),
+}
+
+_CLEAN = str.maketrans(dict.fromkeys(_STRIP, None))
+_EU_NUMBER = re.compile(r"-?(\d{1,3}(\.\d{3})+|\d+)(,\d+)?")
+_US_NUMBER = re.compile(r"-?(\d{1,3}(,\d{3})+|\d+)(\.\d+)?")
+_US_GROUPED = re.compile(r"-?\d{1,3}(,\d{3})+")
+
+# Currency signs that imply a format when the values themselves do not
+_CURRENCY = {"$": US, "£": US, "€": EU}
+
+
+# =========================
+# LOCALE DETECTION
+# =========================
+def detect_locale(series, sample=SAMPLE_SIZE):
+    """EU or US number format of a text column, voted on a sample of values.
+
+    Only values that parse in exactly one of the two formats vote
+    ("1,5" -> EU, "1.5" or "1,234.5" -> US); ambiguous values such as
+    "1,234" do not. A tie is broken by the currency sign ($/£ -> US,
+    € -> EU), then by the commas: if every comma in the sample is
+    followed by a group of exactly 3 digits, the commas are read as US
+    thousands separators. Otherwise EU.
+    """
+    values = pd.unique(series.dropna().astype(str).head(sample * 5))[:sample]
+
+    eu = us = 0
+    currencies = {}
+    comma = grouped = 0
+    for v in values:
+        for sign in _CURRENCY:
+            if sign in v:
+                currencies[_CURRENCY[sign]] = currencies.get(_CURRENCY[sign], 0) + 1
+
+        v = v.translate(_CLEAN)
+        is_eu = _EU_NUMBER.fullmatch(v) is not None
+        is_us = _US_NUMBER.fullmatch(v) is not None
+        eu += is_eu and not is_us
+        us += is_us and not is_eu
+
+        if "," in v:
+            comma += 1
+            grouped += _US_GROUPED.fullmatch(v) is not None
+
+    if us != eu:
+        return US if us > eu else EU
+
+    if currencies.get(US, 0) != currencies.get(EU, 0):
+        return US if currencies.get(US, 0) > currencies.get(EU, 0) else EU
+
+    return US if comma and grouped == comma else EU
+
+
+# =========================
+# PARSING
+# =========================
+def _parse_uniques(uniques, table):
+    """float value and changed-flag per distinct string, in one pass."""
+    parsed = np.empty(len(uniques) + 1)
+    parsed[-1] = np.nan  # slot for missing values (code -1)
+    changed = np.zeros(len(uniques), dtype=bool)
+
+    for i, v in enumerate(uniques):
+        s = str(v)
+        c = s.translate(table)
+        changed[i] = c != s
+        try:
+            parsed[i] = float(c)
+        except ValueError:
+            parsed[i] = np.nan
+
+    return parsed, changed
+
+
+def parse_numeric(series, locale=None):
+    """Parse a text column of (currency) numbers into floats.
+
+    The column is factorized first, so every distinct string is
+    translated and parsed once; the result is gathered back by code.
+    Returns (numeric Series, number of values that were rewritten).
+    """
+    if locale is None:
+        locale = detect_locale(series)
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        uniques = series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+
+    parsed, changed = _parse_uniques(uniques, TABLES[locale])
+
+    numeric = pd.Series(parsed[codes], index=series.index, name=series.name)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+
+    return numeric, int(counts[changed].sum())
+
+
+def fix_columns(df, columns, locale=None):
+    """Parse several text columns at once, each with its own detected locale.
+
+    Returns (new DataFrame, {column: number of values rewritten}).
+    """
+    fixed = {}
+    changes = {}
+    for col in columns:
+        fixed[col], changes[col] = parse_numeric(df[col], locale)
+
+    return df.assign(**fixed), changes
@@ -0,0 +1,167 @@
+import os
+import json
+from dataclasses import asdict, dataclass, fields
+
+import pandas as pd
+
+
+# =========================
+# RECORDS
+# =========================
+@dataclass
+class CheckRecord:
+    metric: str
+    control: str
+    variant: str
+    normality_c: str
+    normality_v: str
+    srm: str
+    sd_c: float
+    sd_v: float
+
+
+@dataclass
+class ImpactRecord:
+    metric: str
+    control: str
+    variant: str
+    n_c: int
+    n_v: int
+    avg_c: float
+    avg_v: float
+    impact: str
+    p_value: float
+    impact_ci: str = "—"
+    median_impact_ci: str = "—"
+    zeros: str = "—"       # "opgenomen" / "uitgesloten"
+    bootstrap: str = "—"   # "ja" / "nee"
+
+
+@dataclass
+class BayesRecord:
+    metric: str
+    control: str
+    variant: str
+    n_c: int
+    n_v: int
+    conv_c: float
+    conv_v: float
+    uplift: str
+    p_beat: float
+    p_best: float
+    loss: float
+    uplift_ci: str = "—"
+
+
+@dataclass
+class CupedRecord:
+    metric: str
+    covariate: str
+    control: str
+    variant: str
+    n_c: int
+    n_v: int
+    avg_c: float
+    avg_v: float
+    impact: str
+    impact_ci: str
+    p_value: float
+    variance_reduction: float
+    theta: float
+
+
+RECORDS = {
+    "checks": CheckRecord,
+    "impact": ImpactRecord,
+    "bayes": BayesRecord,
+    "cuped": CupedRecord,
+}
+
+# Display names, in field order
+COLUMNS = {
+    "checks": [
+        "Metric", "Control", "Variant",
+        "Normality (C)", "Normality (V)",
+        "SRM", "St. deviation (C)", "St. deviation (V)",
+    ],
+    "impact": [
+        "Metric", "Control", "Variant",
+        "Sample (C)", "Sample (V)",
+        "Average (C)", "Average (V)",
+        "Impact (%)", "P-value",
+        "Impact CI (%)", "Mediaan impact CI (%)",
+        "Nullen", "Bootstrap",
+    ],
+    "bayes": [
+        "Metric", "Control", "Variant",
+        "Totaal (C)", "Totaal (V)",
+        "Conversie (C) (%)", "Conversie (V) (%)",
+        "Uplift (%)", "P(Variant > Control)",
+        "P(Beste)", "Verwacht verlies (%)",
+        "Uplift CI (%)",
+    ],
+    "cuped": [
+        "Metric", "Covariaat", "Control", "Variant",
+        "Sample (C)", "Sample (V)",
+        "Gecorrigeerd gem. (C)", "Gecorrigeerd gem. (V)",
+        "Impact (%)", "Impact CI (%)", "P-value",
+        "Variantiereductie (%)", "Theta",
+    ],
+}
+
+
+# =========================
+# STORE
+# =========================
+class ResultsStore:
+    """Append-only analysis results, rendered as DataFrames on demand.
+
+    Records are kept as plain dataclass lists; a table's DataFrame is only
+    rebuilt when it is rendered after new records were added. With a
+    `path`, every append is also written as one JSON line, so the tables
+    survive page reloads.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.records = {kind: [] for kind in RECORDS}
+        self._frames = {}
+
+    @classmethod
+    def load(cls, path):
+        store = cls(path)
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    row = json.loads(line)
+                    kind = row.pop("kind")
+                    store.records[kind].append(RECORDS[kind](**row))
+        return store
+
+    def add(self, kind, records):
+        """Append one record or a list of records of one kind."""
+        if isinstance(records, RECORDS[kind]):
+            records = [records]
+
+        self.records[kind].extend(records)
+        self._frames.pop(kind, None)
+
+        if self.path:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a") as f:
+                for record in records:
+                    f.write(json.dumps({"kind": kind, **asdict(record)}, default=str) + "\n")
+
+    def frame(self, kind):
+        if kind not in self._frames:
+            names = [f.name for f in fields(RECORDS[kind])]
+            df = pd.DataFrame([asdict(r) for r in self.records[kind]], columns=names)
+            df.columns = COLUMNS[kind]
+            self._frames[kind] = df
+        return self._frames[kind]
+
+    def clear(self):
+        self.records = {kind: [] for kind in RECORDS}
+        self._frames = {}
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+# Per (variant, metric[, day]): number of values, their sum and sum of squares.
+# These are the `count`/`sum`/`sum_sq` aggregates of `ingestion.AGGREGATES`.
+SUFFICIENT = ["count", "sum", "sum_sq"]
+KEYS = ["variant", "metric", "day"]
+
+# Conversion exports often name the columns after the Bayesian inputs
+ALIASES = {"totals": "count", "successes": "sum"}
+
+DEFAULT_METRIC = "value"
+
+
+# =========================
+# NORMALIZE
+# =========================
+def normalize(frame):
+    """Canonical sufficient-statistics frame: KEYS present in `frame` + SUFFICIENT.
+
+    Without `sum_sq` every value is taken to be 0/1 (a conversion), for
+    which the sum of squares equals the sum. Without `metric` all rows
+    belong to one metric named DEFAULT_METRIC.
+    """
+    frame = frame.rename(columns={k: v for k, v in ALIASES.items() if v not in frame})
+
+    missing = [c for c in ("variant", "count", "sum") if c not in frame]
+    if missing:
+        raise ValueError(f"Kolommen ontbreken: {', '.join(missing)}")
+
+    if "sum_sq" not in frame:
+        frame = frame.assign(sum_sq=frame["sum"])
+    if "metric" not in frame:
+        frame = frame.assign(metric=DEFAULT_METRIC)
+
+    keys = [k for k in KEYS if k in frame]
+    out = frame[keys + SUFFICIENT].copy()
+    out["variant"] = out["variant"].astype(str)
+    out["metric"] = out["metric"].astype(str)
+    out[SUFFICIENT] = out[SUFFICIENT].astype(np.float64)
+    return out
+
+
+def read_sufficient(file):
+    """One pre-aggregated CSV (a partition, e.g. one day or one experiment)."""
+    file.seek(0)
+    return normalize(pd.read_csv(file))
+
+
+# =========================
+# COMPOSE
+# =========================
+def combine(frames):
+    """Add partitions together; rows with the same keys are summed.
+
+    Counts, sums and sums of squares are additive, so files split by day,
+    by region or by export batch compose into exact totals. Keys missing
+    from some partitions (e.g. no `day`) are dropped from the result.
+    """
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=["variant", "metric"] + SUFFICIENT)
+
+    keys = [k for k in KEYS if all(k in f for f in frames)]
+    combined = pd.concat([f[keys + SUFFICIENT] for f in frames], ignore_index=True)
+    return combined.groupby(keys, sort=True, as_index=False)[SUFFICIENT].sum()
+
+
+def collapse(frame, keys=("metric", "variant")):
+    """Totals over every key not in `keys`, e.g. over days."""
+    return frame.groupby(list(keys), sort=True, as_index=False)[SUFFICIENT].sum()
+
+
+def cumulative(frame, metric):
+    """Running totals per variant over the days of one metric."""
+    daily = collapse(frame[frame["metric"] == metric], ("day", "variant"))
+    daily = daily.sort_values(["variant", "day"], kind="stable")
+    daily[SUFFICIENT] = daily.groupby("variant")[SUFFICIENT].cumsum()
+    return daily.reset_index(drop=True)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+
+# =========================
+# VARIANT INDEX
+# =========================
+class VariantIndex:
+    """Rows grouped by variant, from one factorization of the variant column.
+
+    The column is factorized once into integer codes and a stable argsort
+    of those codes; every arm is then a contiguous range of that
+    permutation. Metric columns are gathered into arm order once per
+    metric, after which each arm's values are a slice view, so switching
+    control/variant costs O(arm size) instead of a string comparison over
+    the whole dataset.
+    """
+
+    def __init__(self, series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            labels = series.cat.categories.astype(str).tolist()
+        else:
+            codes, uniques = pd.factorize(series)
+            labels = [str(u) for u in uniques]
+
+        # Missing labels (code -1) become their own "nan" arm, as astype(str) does
+        if (codes < 0).any():
+            codes = np.where(codes < 0, len(labels), codes)
+            labels.append("nan")
+
+        self.labels = labels
+        self.order = np.argsort(codes, kind="stable")
+        self.codes = codes[self.order]
+        self.bounds = np.r_[0, np.cumsum(np.bincount(codes, minlength=len(labels)))]
+
+        self._position = {label: i for i, label in enumerate(labels)}
+        self._gathered = {}
+
+    def size(self, label):
+        i = self._position[str(label)]
+        return int(self.bounds[i + 1] - self.bounds[i])
+
+    def counts(self):
+        """Rows per arm, in label order."""
+        return np.diff(self.bounds)
+
+    def gather(self, key, series, fill_value=0):
+        """float64 values of `series` in arm order, NaN filled (cached by key)."""
+        if key not in self._gathered:
+            values = series.to_numpy(dtype=float, na_value=np.nan)[self.order]
+            values[np.isnan(values)] = fill_value
+            self._gathered[key] = values
+        return self._gathered[key]
+
+    def arm(self, key, series, label):
+        """Values of one arm as a view into the gathered metric."""
+        i = self._position[str(label)]
+        return self.gather(key, series)[self.bounds[i]:self.bounds[i + 1]]
+
+    def successes(self, key, series):
+        """Rows with a value > 0 per arm, in one bincount over the arm codes."""
+        values = self.gather(key, series)
+        counts = np.bincount(self.codes, weights=values > 0, minlength=len(self.labels))
+        return counts.astype(np.int64)
+
+    def forget(self, key):
+        self._gathered.pop(key, None)
@@ -2,16 +2,34 @@ import os
 import sys
 import re
 import streamlit as st
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
 # ==============================
 # PATH SETUP
 # ==============================
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
 sys.path.append(os.path.join(ROOT_DIR, "statistics"))
-
-from non_parametric_stats import analyze_with_zeros, analyze_no_zeros
+sys.path.append(os.path.join(ROOT_DIR, "data"))
+
+from non_parametric_stats import analyze, analyze_batch
+from cuped_stats import analyze_cuped
+from non_parametric_power import power_curve
+from rank_stats import PooledRanks
+from histograms import CLIP, LINEAR, LOG, HistogramCache, histogram_figure
+from results_store import CheckRecord, CupedRecord, ImpactRecord
+from analysis_cache import AnalysisKey
+from calculator_ui import (
+    analysis_cache,
+    column_check,
+    init_state,
+    load_upload,
+    metric_key,
+    push_results,
+    results_store,
+    variant_index
+)
 
 # ==============================
 # PAGE CONFIG
@@ -22,54 +40,19 @@ st.title("Non-Parametric Calculator")
 # ==============================
 # SESSION STATE
 # ==============================
-cols_checks = [
-    "Metric","Control","Variant",
-    "Normality (C)","Normality (V)",
-    "SRM","St. deviation (C)","St. deviation (V)"
-]
-
-cols_impact = [
-    "Metric","Control","Variant",
-    "Sample (C)","Sample (V)",
-    "Average (C)","Average (V)",
-    "Impact (%)","P-value"
-]
-
-if "checks" not in st.session_state:
-    st.session_state.checks = pd.DataFrame(columns=cols_checks)
-
-if "impact" not in st.session_state:
-    st.session_state.impact = pd.DataFrame(columns=cols_impact)
+results_store(
+    "results",
+    os.path.splitext(os.path.basename(__file__))[0]
+)
 
 if "show_plot" not in st.session_state:
     st.session_state.show_plot = False
 
-if "df" not in st.session_state:
-    st.session_state.df = None
-
-if "transform_log" not in st.session_state:
-    st.session_state.transform_log = {}
+init_state()
 
 # ==============================
 # HELPERS
 # ==============================
-def format_rows(n):
-    if n >= 1_000_000:
-        return f"{round(n/1_000_000)}M"
-    if n >= 1_000:
-        return f"{round(n/1_000)}K"
-    return str(n)
-
-def column_conclusion(series):
-    if pd.api.types.is_integer_dtype(series):
-        return "✅ integer"
-    if pd.api.types.is_float_dtype(series):
-        return "✅ float"
-    return f"❌ {series.dtype}"
-
-def sd(series):
-    return round(series.std(ddof=1),2)
-
 def safe_round(value,decimals=2):
     if isinstance(value,(int,float)):
         return round(value,decimals)
@@ -86,84 +69,113 @@ def normalize_normality(value):
             return "normal"
     return value
 
-def get_sample(series,exclude_zeros=True):
-    if exclude_zeros:
-        return series[series!=0]
-    return series
-
-# ==============================
-# VALUE LOGGING
-# ==============================
-def value_distribution(series):
-
-    s = pd.to_numeric(series, errors="coerce")
-
-    total = len(s)
-    zeros = (s==0).sum()
-    valid = s.notna().sum()
-
-    return {
-        "total":int(total),
-        "zeros":int(zeros)
-    }
-
-# ==============================
-# DETECT TRANSFORMABLE
-# ==============================
-def needs_transformation(series):
-
-    if series.dtype!="object":
-        return False
-
-    sample = series.dropna().astype(str).head(50)
-
-    pattern=r"[€$£]|,|\."
-
-    for v in sample:
-        if re.search(pattern,v):
-            return True
+def parse_sizes(text):
+    # "1000, 5000", "10.000" (punt als duizendtal) en "1e4" zijn allemaal geldig
+    sizes=[]
+    for s in re.split(r"[,;\s]+",text.strip()):
+        if not s:
+            continue
+        if re.fullmatch(r"\d{1,3}(\.\d{3})+",s):
+            s=s.replace(".","")
+        try:
+            n=float(s)
+        except ValueError:
+            raise ValueError(f"'{s}' is geen getal")
+        if not np.isfinite(n) or n<2 or n!=int(n):
+            raise ValueError(f"'{s}' is geen geheel aantal ≥ 2")
+        sizes.append(int(n))
+    if not sizes:
+        raise ValueError("geen steekproefgroottes opgegeven")
+    return sizes
+
+def analysis_key(variant_col,metric_col,control,variant,exclude_zeros,bootstrap):
+    log=st.session_state.transform_log
+    return AnalysisKey(
+        st.session_state.dataset_hash,
+        variant_col,
+        log.get(variant_col),
+        metric_col,
+        log.get(metric_col),
+        str(control),
+        str(variant),
+        exclude_zeros,
+        bootstrap
+    )
 
-    return False
+def result_records(metric,control,variant,r,sd_c,sd_v,exclude_zeros,bootstrap):
+    # r: AnalysisResult.as_dict()
+    check=CheckRecord(
+        metric,
+        control,
+        variant,
+        normalize_normality(r["normalA"]),
+        normalize_normality(r["normalB"]),
+        r["srm"],
+        safe_round(sd_c, 2),
+        safe_round(sd_v, 2)
+    )
 
-# ==============================
-# CLEAN NUMERIC (ROBUST EU)
-# ==============================
-def clean_numeric(series):
-
-    original = series.astype(str)
-
-    cleaned = (
-        original
-        .str.replace("€","",regex=False)
-        .str.replace("$","",regex=False)
-        .str.replace("£","",regex=False)
-        .str.replace(" ","",regex=False)
-        .str.replace(".","",regex=False)
-        .str.replace(",",".",regex=False)
+    impact=ImpactRecord(
+        metric,
+        control,
+        variant,
+        r["nA"],
+        r["nB"],
+        safe_round(r["avgA"], 2),
+        safe_round(r["avgB"], 2),
+        safe_round(r["impact"], 2),
+        safe_round(r["p_value"], 4),
+        r.get("impact_ci", "—"),
+        r.get("median_impact_ci", "—"),
+        "uitgesloten" if exclude_zeros else "opgenomen",
+        "ja" if bootstrap else "nee"
     )
 
-    numeric = pd.to_numeric(cleaned,errors="coerce")
+    return check,impact
 
-    changed = (original != cleaned).sum()
+def get_sample(series,exclude_zeros=True):
+    if exclude_zeros:
+        return series[series!=0]
+    return series
+
+def rank_engine(df,variant_col,metric_col,exclude_zeros):
+    # sorted once per (column, zero-mode, fix state); reused for every pair
+    key=(variant_col,*metric_key(metric_col),exclude_zeros)
+
+    if key not in st.session_state.rank_engines:
+        index=variant_index(df,variant_col)
+        st.session_state.rank_engines[key]=PooledRanks.from_codes(
+            index.gather(metric_key(metric_col),df[metric_col]),
+            index.codes,
+            index.labels,
+            exclude_zeros
+        )
 
-    return numeric, changed
+    return st.session_state.rank_engines[key]
 
 # ==============================
 # PLOT
 # ==============================
-def plot_raw(a,b,label):
+HIST_SCALES = {
+    "Lineair":LINEAR,
+    "Log":LOG,
+    "Geknipt (1%–99%)":CLIP
+}
 
-    fig,ax=plt.subplots(figsize=(5,3))
+@st.cache_resource
+def histogram_cache():
+    return HistogramCache()
 
-    ax.hist(a,bins=100,alpha=0.6,label="Control")
-    ax.hist(b,bins=100,alpha=0.6,label="Variant")
+def plot_raw(key,a,b,label,scale):
 
-    ax.set_xlabel(label)
-    ax.set_title("Raw distribution")
+    # counts are computed once per key; the chart only receives the bins
+    hist=histogram_cache().get(key,a,b,bins=100,scale=scale)
 
-    ax.legend()
+    st.plotly_chart(histogram_figure(hist,label),use_container_width=True)
 
-    st.pyplot(fig)
+    outside=hist["outside_a"]+hist["outside_b"]
+    if outside:
+        st.caption(f"{outside} waardes buiten het bereik van de grafiek")
 
 # ==============================
 # FILE UPLOAD
@@ -172,70 +184,9 @@ file=st.file_uploader("Upload CSV")
 
 if file:
 
-    if st.session_state.df is None:
-        st.session_state.df=pd.read_csv(file)
+    df=load_upload(file)
 
-    df=st.session_state.df
-
-    st.caption(f"{format_rows(len(df))} rows")
-
-    # ==============================
-    # KOLOMCONTROLE
-    # ==============================
-    st.markdown("### Kolomcontrole")
-
-    box = st.container(border=True)
-
-    with box:
-
-        h1,h2,h3,h4 = st.columns([3,2,1.5,5])
-
-        h1.markdown("**Kolom**")
-        h2.markdown("**Type**")
-        h3.markdown("**Fix**")
-        h4.markdown("**Status**")
-
-        for col in df.columns:
-
-            c1,c2,c3,c4 = st.columns([3,2,1.5,5])
-
-            c1.write(col)
-
-            c2.write(column_conclusion(df[col]))
-
-            transformed = col in st.session_state.transform_log
-            transformable = needs_transformation(df[col])
-
-            if transformable:
-
-                if c3.button(
-                    "Fix",
-                    key=f"transform_{col}",
-                    disabled=transformed
-                ):
-
-                    new_col,changed = clean_numeric(df[col])
-
-                    df[col]=new_col
-                    st.session_state.df=df
-
-                    st.session_state.transform_log[col]=changed
-
-                    st.rerun()
-
-            if col in st.session_state.transform_log:
-
-                changed = st.session_state.transform_log[col]
-
-                dist=value_distribution(df[col])
-
-                c4.markdown(
-                    f"""
-                    ✅ {changed} values aangepast  
-                    total: {dist['total']}  
-                    zeros: {dist['zeros']}  
-                    """
-                )
+    df=column_check(df)
 
     # ==============================
     # ANALYSE INSTELLINGEN
@@ -264,7 +215,9 @@ if file:
         index=0
     )
 
-    variants=df[variant_col].astype(str).unique()
+    index=variant_index(df,variant_col)
+
+    variants=index.labels
 
     control_col,variant_col_select = st.columns(2)
 
@@ -276,77 +229,256 @@ if file:
 
     exclude_zeros=statistic_type=="Waardes uitsluiten"
 
-    raw_a=df.loc[
-        df[variant_col].astype(str)==control,metric_col
-    ].fillna(0)
+    bootstrap=st.checkbox("Bootstrap CI voor impact (gemiddelde & mediaan)")
+
+    covariates=[c for c in numeric_cols if c!=metric_col]
+
+    cuped=st.checkbox(
+        "CUPED (variantiereductie met pre-periode covariaat)",
+        disabled=not covariates
+    )
 
-    raw_b=df.loc[
-        df[variant_col].astype(str)==variant,metric_col
-    ].fillna(0)
+    if cuped:
+        covariate_col=st.selectbox("Covariaat (pre-periode)",covariates)
 
-    set_a=get_sample(raw_a,exclude_zeros)
-    set_b=get_sample(raw_b,exclude_zeros)
+    # slice views of the metric gathered in arm order (NaN -> 0)
+    raw_a=index.arm(metric_key(metric_col),df[metric_col],control)
+    raw_b=index.arm(metric_key(metric_col),df[metric_col],variant)
+
+    # zero-excluded copies are only made where they are used (plot, power);
+    # the analysis copies each arm once itself
 
     if st.button("📊 Grafiek tonen / verbergen"):
         st.session_state.show_plot=not st.session_state.show_plot
 
     if st.session_state.show_plot:
-        plot_raw(set_a,set_b,metric_col)
+
+        scale=st.radio("Schaal",list(HIST_SCALES),horizontal=True)
+
+        plot_raw(
+            (
+                st.session_state.dataset_hash,
+                variant_col,
+                control,
+                variant,
+                *metric_key(metric_col),
+                exclude_zeros
+            ),
+            lambda: get_sample(raw_a,exclude_zeros),
+            lambda: get_sample(raw_b,exclude_zeros),
+            metric_col,
+            HIST_SCALES[scale]
+        )
+
+    # ==============================
+    # POWER SIMULATIE
+    # ==============================
+    with st.expander("Power simulatie (Mann-Whitney)"):
+
+        st.caption("Resampling uit de control-waardes met een toegevoegde lift.")
+
+        p1,p2,p3 = st.columns(3)
+
+        lift_pct=p1.number_input("Lift (%)",value=5.0,step=1.0)
+        sizes_text=p2.text_input("Steekproef per arm","1000, 5000, 10000")
+        replicates=p3.number_input("Replicaties",min_value=100,value=2000,step=100)
+
+        if st.button("Power simuleren"):
+
+            try:
+                sizes=parse_sizes(sizes_text)
+            except ValueError as e:
+                st.error(f"❌ Steekproef per arm: {e}")
+                sizes=[]
+
+            if sizes:
+
+                power=power_curve(
+                    get_sample(raw_a,exclude_zeros),
+                    [lift_pct/100],
+                    sizes,
+                    replicates=int(replicates)
+                )
+
+                st.dataframe(
+                    pd.DataFrame({
+                        "Steekproef per arm":sizes,
+                        "Power":np.round(power[0],3)
+                    }),
+                    use_container_width=True
+                )
 
     # ==============================
     # ANALYSE
     # ==============================
     if st.button("Analyse uitvoeren"):
 
-        if exclude_zeros:
-            r = analyze_no_zeros(set_a, set_b)
-        else:
-            r = analyze_with_zeros(set_a, set_b)
+        def run_pair():
+            mw = rank_engine(df, variant_col, metric_col, exclude_zeros).compare(control, variant)
+
+            result = analyze(
+                raw_a,
+                raw_b,
+                exclude_zeros,
+                p_value=mw["p_value"],
+                bootstrap=bootstrap,
+                workers=None
+            )
+
+            return {
+                **result.as_dict(),
+                "stdA":result.control.std,
+                "stdB":result.variant.std
+            }
+
+        # repeat analyses of the same pair are served from the cache
+        row = analysis_cache().get(
+            analysis_key(variant_col,metric_col,control,variant,exclude_zeros,bootstrap),
+            run_pair
+        )
 
-        st.session_state.checks.loc[len(st.session_state.checks)] = [
+        check,impact = result_records(
             metric_col,
             control,
             variant,
-            normalize_normality(r["normalA"]),
-            normalize_normality(r["normalB"]),
-            r["srm"],
-            sd(set_a),
-            sd(set_b)
-        ]
+            row,
+            row["stdA"],
+            row["stdB"],
+            exclude_zeros,
+            bootstrap
+        )
 
-        st.session_state.impact.loc[len(st.session_state.impact)] = [
-            metric_col,
-            control,
-            variant,
-            len(set_a),
-            len(set_b),
-            safe_round(r["avgA"], 2),
-            safe_round(r["avgB"], 2),
-            safe_round(r["impact"], 2),
-            safe_round(r["p_value"], 4)
+        st.session_state.results.add("checks", check)
+        st.session_state.results.add("impact", impact)
+
+        if cuped and variant!=control:
+
+            # θ and all adjusted arm moments from one grouped pass over the index
+            out = analyze_cuped(
+                index.gather(metric_key(metric_col),df[metric_col]),
+                index.gather(metric_key(covariate_col),df[covariate_col]),
+                index.codes,
+                index.labels,
+                control,
+                exclude_zeros
+            )
+
+            row = out[out["variant"]==str(variant)].iloc[0]
+
+            st.session_state.results.add("cuped", CupedRecord(
+                metric_col,
+                covariate_col,
+                control,
+                variant,
+                int(row["nA"]),
+                int(row["nB"]),
+                float(row["avgA"]),
+                float(row["avgB"]),
+                row["impact"],
+                row["impact_ci"],
+                float(row["p_value"]),
+                float(row["variance_reduction"]),
+                float(row["theta"])
+            ))
+
+    # ==============================
+    # ANALYSE — ALLE METRICS × VARIANTEN
+    # ==============================
+    batch_metrics=st.multiselect(
+        "Metrics voor 'Alles analyseren'",
+        numeric_cols,
+        default=[metric_col] if metric_col in numeric_cols else []
+    )
+
+    if st.button("Alles analyseren (alle varianten vs control)") and batch_metrics:
+
+        cache=analysis_cache()
+
+        keys={
+            (m,v):analysis_key(variant_col,m,control,v,exclude_zeros,bootstrap)
+            for m in batch_metrics
+            for v in sorted(index.labels)
+            if v!=str(control)
+        }
+
+        rows={mv:cache.lookup(k) for mv,k in keys.items()}
+
+        # only metrics with an uncached pair are analysed, in one batch
+        missing=list(dict.fromkeys(m for (m,_),row in rows.items() if row is None))
+
+        if missing:
+            # arms and pooled ranks come from the page's index, not re-sorted here
+            out = analyze_batch(
+                {m:index.gather(metric_key(m),df[m]) for m in missing},
+                index.codes,
+                index.bounds,
+                index.labels,
+                control,
+                exclude_zeros,
+                bootstrap=bootstrap,
+                ranks={m:rank_engine(df,variant_col,m,exclude_zeros) for m in missing},
+                workers=None
+            )
+
+            for row in out.to_dict("records"):
+                mv=(row["metric"],row["variant"])
+                cache.store(keys[mv],row)
+                rows[mv]=row
+
+        records=[
+            result_records(
+                m,
+                control,
+                v,
+                rows[(m,v)],
+                rows[(m,v)]["stdA"],
+                rows[(m,v)]["stdB"],
+                exclude_zeros,
+                bootstrap
+            )
+            for m,v in keys
         ]
 
+        st.session_state.results.add("checks", [c for c,_ in records])
+        st.session_state.results.add("impact", [i for _,i in records])
+
+    info=analysis_cache().info()
+    st.caption(
+        f"Analyse-cache: {info['hits']} hits · {info['misses']} misses · "
+        f"{info['size']} resultaten opgeslagen"
+    )
+
 # ==============================
 # OUTPUT
 # ==============================
 st.subheader("Analyse checks")
 
 st.dataframe(
-    st.session_state.checks,
+    st.session_state.results.frame("checks"),
     use_container_width=True
 )
 
 st.subheader("Impact")
 
 st.dataframe(
-    st.session_state.impact,
+    st.session_state.results.frame("impact"),
     use_container_width=True
 )
 
+push_results(st.session_state.results.frame("impact"),"impact")
+
+if st.session_state.results.records["cuped"]:
+
+    st.subheader("Impact (CUPED)")
+
+    st.dataframe(
+        st.session_state.results.frame("cuped"),
+        use_container_width=True
+    )
+
 if st.button("Reset tabellen"):
 
-    st.session_state.checks=st.session_state.checks.iloc[0:0]
-    st.session_state.impact=st.session_state.impact.iloc[0:0]
+    st.session_state.results.clear()
     st.session_state.transform_log={}
 
     st.success("Tabellen gereset ✅")
\ No newline at end of file
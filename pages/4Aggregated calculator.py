@@ -0,0 +1,143 @@
+import io
+import os
+import sys
+import streamlit as st
+import plotly.express as px
+
+# ==============================
+# PATH SETUP
+# ==============================
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT_DIR, "statistics"))
+sys.path.append(os.path.join(ROOT_DIR, "data"))
+
+from summary_stats import analyze_summary
+from sufficient_stats import SUFFICIENT, collapse, combine, cumulative, read_sufficient
+
+# ==============================
+# PAGE CONFIG
+# ==============================
+st.set_page_config(layout="wide")
+st.title("Geaggregeerde Calculator")
+
+st.caption(
+    "Eén rij per variant (optioneel per metric en/of dag) met `count`, `sum` en "
+    "`sum_sq`. Conversiedata mag ook als `totals` en `successes`; zonder "
+    "`sum_sq` wordt de metric als 0/1 behandeld. Meerdere bestanden "
+    "(bijv. één per dag) worden bij elkaar opgeteld."
+)
+
+# ==============================
+# SESSION STATE
+# ==============================
+if "summary" not in st.session_state:
+    st.session_state.summary = None
+
+# ==============================
+# HELPERS
+# ==============================
+@st.cache_data
+def read_partition(data):
+    # aggregated files are small; cached on their bytes
+    return read_sufficient(io.BytesIO(data))
+
+display_names = {
+    "metric":"Metric",
+    "control":"Control",
+    "variant":"Variant",
+    "nA":"Sample (C)",
+    "nB":"Sample (V)",
+    "avgA":"Average (C)",
+    "avgB":"Average (V)",
+    "stdA":"St. deviation (C)",
+    "stdB":"St. deviation (V)",
+    "srm":"SRM",
+    "impact":"Impact (%)",
+    "impact_ci":"Impact CI (%)",
+    "p_value":"P-value (Welch)",
+    "p_beat":"P(Variant > Control)"
+}
+
+# ==============================
+# UPLOAD
+# ==============================
+files = st.file_uploader(
+    "Upload geaggregeerde CSV's",
+    type="csv",
+    accept_multiple_files=True
+)
+
+if files:
+
+    partitions=[]
+
+    for f in files:
+        try:
+            partitions.append(read_partition(f.getvalue()))
+        except ValueError as e:
+            st.error(f"{f.name}: {e}")
+
+    data=combine(partitions)
+
+    if data.empty:
+        st.stop()
+
+    st.caption(f"{len(partitions)} bestanden · {len(data)} rijen na combineren")
+
+    totals=collapse(data)
+
+    with st.expander("Totalen per metric en variant"):
+        st.dataframe(totals,use_container_width=True)
+
+    # ==============================
+    # ANALYSE
+    # ==============================
+    st.markdown("### Analyse instellingen")
+
+    variants=sorted(totals["variant"].unique())
+    metrics=sorted(totals["metric"].unique())
+
+    control_col_select,metric_col_select = st.columns(2)
+
+    with control_col_select:
+        control=st.selectbox("Control",variants)
+
+    with metric_col_select:
+        selected=st.multiselect("Metrics",metrics,default=metrics)
+
+    if st.button("Analyse uitvoeren") and selected:
+
+        st.session_state.summary=analyze_summary(
+            totals[totals["metric"].isin(selected)],
+            control
+        )
+
+    if st.session_state.summary is not None:
+        st.dataframe(
+            st.session_state.summary.rename(columns=display_names),
+            use_container_width=True
+        )
+
+    # ==============================
+    # PER DAG
+    # ==============================
+    if "day" in data:
+
+        with st.expander("Cumulatief per dag"):
+
+            metric=st.selectbox("Metric",metrics,key="daily_metric")
+
+            daily=cumulative(data,metric)
+            daily["Gemiddelde"]=daily["sum"]/daily["count"]
+
+            fig=px.line(
+                daily,
+                x="day",
+                y="Gemiddelde",
+                color="variant",
+                markers=True,
+                hover_data=SUFFICIENT
+            )
+            fig.update_layout(height=350,margin=dict(l=10,r=10,t=20,b=10))
+
+            st.plotly_chart(fig,use_container_width=True)
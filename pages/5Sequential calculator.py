@@ -0,0 +1,182 @@
+import io
+import os
+import sys
+import streamlit as st
+import numpy as np
+import plotly.graph_objects as go
+
+# ==============================
+# PATH SETUP
+# ==============================
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT_DIR, "statistics"))
+sys.path.append(os.path.join(ROOT_DIR, "data"))
+
+from sequential_stats import trajectory
+from sufficient_stats import collapse, combine, read_sufficient
+
+# ==============================
+# PAGE CONFIG
+# ==============================
+st.set_page_config(layout="wide")
+st.title("Sequential Calculator")
+
+st.caption(
+    "Dagelijks meekijken zonder p-hacking: altijd-geldige p-waardes en "
+    "betrouwbaarheidsreeksen (mSPRT). Upload geaggregeerde CSV's met een "
+    "`day` kolom en `count`, `sum`, `sum_sq` per variant (of `totals`/`successes`). "
+    "Een nieuwe dag is één kleine update per experiment."
+)
+
+# ==============================
+# HELPERS
+# ==============================
+@st.cache_data
+def read_partition(data):
+    # aggregated files are small; cached on their bytes
+    return read_sufficient(io.BytesIO(data))
+
+def boundary_figure(path,label):
+    # drop the days before both arms have a variance estimate
+    path=path[np.isfinite(path["ci_low"])&np.isfinite(path["ci_high"])]
+
+    fig=go.Figure()
+    fig.add_trace(go.Scatter(
+        x=path["day"],y=path["ci_high"],mode="lines",
+        line=dict(width=0),showlegend=False,hoverinfo="skip"
+    ))
+    fig.add_trace(go.Scatter(
+        x=path["day"],y=path["ci_low"],mode="lines",fill="tonexty",
+        line=dict(width=0),name="Betrouwbaarheidsreeks"
+    ))
+    fig.add_trace(go.Scatter(
+        x=path["day"],y=path["estimate"],mode="lines+markers",name="Verschil"
+    ))
+    fig.add_hline(y=0,line_dash="dash",line_color="grey")
+
+    fig.update_layout(
+        title="Boundary trajectory",
+        xaxis_title="Dag",
+        yaxis_title=f"Verschil in {label} (variant − control)",
+        height=350,
+        margin=dict(l=10,r=10,t=40,b=10)
+    )
+    return fig
+
+def p_value_figure(path,alpha):
+    fig=go.Figure()
+    fig.add_trace(go.Scatter(
+        x=path["day"],y=path["p_value"],mode="lines+markers",name="Altijd-geldige p-waarde"
+    ))
+    fig.add_hline(y=alpha,line_dash="dash",line_color="red")
+
+    fig.update_layout(
+        xaxis_title="Dag",
+        yaxis_title="p-waarde",
+        yaxis_type="log",
+        height=300,
+        margin=dict(l=10,r=10,t=20,b=10)
+    )
+    return fig
+
+# ==============================
+# UPLOAD
+# ==============================
+files = st.file_uploader(
+    "Upload geaggregeerde CSV's (per dag)",
+    type="csv",
+    accept_multiple_files=True
+)
+
+if files:
+
+    partitions=[]
+
+    for f in files:
+        try:
+            partitions.append(read_partition(f.getvalue()))
+        except ValueError as e:
+            st.error(f"{f.name}: {e}")
+
+    data=combine(partitions)
+
+    if data.empty:
+        st.stop()
+
+    if "day" not in data:
+        st.error("❌ Kolom 'day' ontbreekt; sequentieel testen heeft data per dag nodig.")
+        st.stop()
+
+    # ==============================
+    # INSTELLINGEN
+    # ==============================
+    st.markdown("### Analyse instellingen")
+
+    s1,s2,s3,s4 = st.columns(4)
+
+    metric=s1.selectbox("Metric",sorted(data["metric"].unique()))
+
+    daily=collapse(data[data["metric"]==metric],("day","variant"))
+
+    control=s2.selectbox("Control",sorted(daily["variant"].unique()))
+
+    alpha=s3.number_input("Alpha",min_value=0.001,max_value=0.2,value=0.05,step=0.01)
+
+    effect_pct=s4.number_input(
+        "Verwacht effect (% van control)",
+        min_value=0.1,
+        value=5.0,
+        step=0.5,
+        help="Bepaalt de mixing-verdeling van de mSPRT; kies vooraf, niet na het kijken."
+    )
+
+    # tau in metric units, fixed by the control mean of the first day
+    first=daily[(daily["variant"]==control)].sort_values("day").iloc[0]
+    tau=effect_pct/100*abs(first["sum"]/first["count"])
+
+    if not tau>0:
+        st.error("❌ Control heeft op de eerste dag geen gemiddelde > 0.")
+        st.stop()
+
+    path=trajectory(daily,control,tau,alpha)
+
+    if path.empty:
+        st.warning("⚠ Geen varianten naast de control gevonden.")
+        st.stop()
+
+    # ==============================
+    # STAND VAN VANDAAG
+    # ==============================
+    latest=path[path["day"]==path["day"].max()].copy()
+
+    base=collapse(daily[daily["variant"]==control],("variant",)).iloc[0]
+    control_mean=base["sum"]/base["count"]
+
+    latest["Impact (%)"]=np.round(latest["estimate"]/control_mean*100,2)
+    latest["Significant"]=np.where(latest["p_value"]<alpha,"✅ ja","nee")
+
+    st.markdown("### Stand na de laatste dag")
+
+    st.dataframe(
+        latest.rename(columns={
+            "day":"Dag",
+            "variant":"Variant",
+            "nA":"Sample (C)",
+            "nB":"Sample (V)",
+            "estimate":"Verschil",
+            "ci_low":"CS laag",
+            "ci_high":"CS hoog",
+            "p_value":"P-value (altijd geldig)"
+        }),
+        use_container_width=True
+    )
+
+    # ==============================
+    # TRAJECTORY
+    # ==============================
+    variant=st.selectbox("Variant voor grafiek",latest["variant"].tolist())
+
+    variant_path=path[path["variant"]==variant]
+
+    st.plotly_chart(boundary_figure(variant_path,metric),use_container_width=True)
+    st.plotly_chart(p_value_figure(variant_path,alpha),use_container_width=True)
@@ -0,0 +1,217 @@
+import numpy as np
+from scipy.stats import norm
+
+# All functions broadcast over NumPy arrays, so whole planning grids are
+# evaluated in one call. `allocation` is the share of traffic that goes
+# to the variant (0.5 = equal split).
+
+
+# =========================
+# HELPERS
+# =========================
+def z_alpha(alpha, alternative="two-sided"):
+    alpha = np.asarray(alpha, dtype=float)
+    if alternative == "two-sided":
+        return norm.isf(alpha / 2)
+    if alternative == "one-sided":
+        return norm.isf(alpha)
+    raise ValueError("alternative must be 'two-sided' or 'one-sided'")
+
+
+def z_power(power):
+    return norm.ppf(np.asarray(power, dtype=float))
+
+
+def split_factor(allocation=0.5):
+    """sqrt(1/n_C + 1/n_V) for a total sample size of 1."""
+    w = np.asarray(allocation, dtype=float)
+    return np.sqrt(1 / (1 - w) + 1 / w)
+
+
+def proportion_sd(baseline_rate):
+    p = np.asarray(baseline_rate, dtype=float)
+    return np.sqrt(p * (1 - p))
+
+
+# =========================
+# MDE
+# =========================
+def mde_mean(
+    std,
+    n_total,
+    alpha=0.05,
+    power=0.8,
+    allocation=0.5,
+    alternative="two-sided",
+    mean=None,
+):
+    """Absolute MDE for a difference in means, relative when `mean` is given."""
+    n_total = np.asarray(n_total, dtype=float)
+    delta = (
+        (z_alpha(alpha, alternative) + z_power(power))
+        * np.asarray(std, dtype=float)
+        * split_factor(allocation)
+        / np.sqrt(n_total)
+    )
+    if mean is None:
+        return delta
+    return delta / np.asarray(mean, dtype=float)
+
+
+def mde_proportion(
+    baseline_rate,
+    n_total,
+    alpha=0.05,
+    power=0.8,
+    allocation=0.5,
+    alternative="two-sided",
+    relative=True,
+):
+    """MDE for a conversion rate, using the baseline variance for both arms."""
+    return mde_mean(
+        proportion_sd(baseline_rate),
+        n_total,
+        alpha,
+        power,
+        allocation,
+        alternative,
+        mean=baseline_rate if relative else None,
+    )
+
+
+# =========================
+# SAMPLE SIZE
+# =========================
+def sample_size_mean(
+    std,
+    mde,
+    alpha=0.05,
+    power=0.8,
+    allocation=0.5,
+    alternative="two-sided",
+    mean=None,
+):
+    """Total sample size (both arms) needed to detect `mde`.
+
+    `mde` is absolute, or relative to `mean` when `mean` is given.
+    """
+    delta = np.asarray(mde, dtype=float)
+    if mean is not None:
+        delta = delta * np.asarray(mean, dtype=float)
+
+    n = (
+        (z_alpha(alpha, alternative) + z_power(power))
+        * np.asarray(std, dtype=float)
+        * split_factor(allocation)
+        / delta
+    ) ** 2
+    return np.ceil(n)
+
+
+def sample_size_proportion(
+    baseline_rate,
+    mde,
+    alpha=0.05,
+    power=0.8,
+    allocation=0.5,
+    alternative="two-sided",
+    relative=True,
+):
+    return sample_size_mean(
+        proportion_sd(baseline_rate),
+        mde,
+        alpha,
+        power,
+        allocation,
+        alternative,
+        mean=baseline_rate if relative else None,
+    )
+
+
+# =========================
+# POWER
+# =========================
+def power_mean(
+    std,
+    mde,
+    n_total,
+    alpha=0.05,
+    allocation=0.5,
+    alternative="two-sided",
+    mean=None,
+):
+    """Power to detect `mde` (absolute, or relative to `mean`) with `n_total`."""
+    delta = np.abs(np.asarray(mde, dtype=float))
+    if mean is not None:
+        delta = delta * np.asarray(mean, dtype=float)
+
+    se = (
+        np.asarray(std, dtype=float)
+        * split_factor(allocation)
+        / np.sqrt(np.asarray(n_total, dtype=float))
+    )
+    return norm.cdf(delta / se - z_alpha(alpha, alternative))
+
+
+def power_proportion(
+    baseline_rate,
+    mde,
+    n_total,
+    alpha=0.05,
+    allocation=0.5,
+    alternative="two-sided",
+    relative=True,
+):
+    return power_mean(
+        proportion_sd(baseline_rate),
+        mde,
+        n_total,
+        alpha,
+        allocation,
+        alternative,
+        mean=baseline_rate if relative else None,
+    )
+
+
+# =========================
+# GRIDS
+# =========================
+def mde_grid(
+    baseline_rate,
+    daily_traffic,
+    days,
+    alpha=0.05,
+    power=0.8,
+    allocation=0.5,
+    alternative="two-sided",
+    relative=True,
+):
+    """MDE for proportions over the outer product of all grid inputs.
+
+    Returns an array of shape
+    (len(baseline_rate), len(daily_traffic), len(days), len(alpha), len(power));
+    scalar inputs count as length 1.
+    """
+    p, traffic, d, a, pw = np.ix_(*(
+        np.atleast_1d(np.asarray(x, dtype=float))
+        for x in (baseline_rate, daily_traffic, days, alpha, power)
+    ))
+    return mde_proportion(p, traffic * d, a, pw, allocation, alternative, relative)
+
+
+def mde_mean_grid(
+    std,
+    daily_traffic,
+    days,
+    alpha=0.05,
+    power=0.8,
+    allocation=0.5,
+    alternative="two-sided",
+    mean=None,
+):
+    """MDE for means over the outer product of std, traffic, days, alpha, power."""
+    s, traffic, d, a, pw = np.ix_(*(
+        np.atleast_1d(np.asarray(x, dtype=float))
+        for x in (std, daily_traffic, days, alpha, power)
+    ))
+    return mde_mean(s, traffic * d, a, pw, allocation, alternative, mean)
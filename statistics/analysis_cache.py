@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+# =========================
+# KEY
+# =========================
+@dataclass(frozen=True)
+class AnalysisKey:
+    dataset_hash: str
+    variant_col: str
+    variant_state: object  # transform state of the variant column
+    metric: str
+    metric_state: object   # transform state of the metric column
+    control: str
+    variant: str
+    exclude_zeros: bool
+    bootstrap: bool = False
+    alpha: float = 0.05
+
+    @property
+    def columns(self):
+        return (self.variant_col, self.metric)
+
+
+# =========================
+# CACHE
+# =========================
+class AnalysisCache:
+    """Analysis rows (`AnalysisResult.as_dict()` plus stdA/stdB) per AnalysisKey.
+
+    Least recently used entries are dropped beyond `max_entries`. The key
+    carries the transform state of both columns, so a fixed column never
+    hits a stale entry; `invalidate` additionally frees those entries.
+    Shared by every session (thread), so the entries are guarded by a lock;
+    `get` computes a missing row outside it.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._rows)
+
+    def lookup(self, key):
+        """Cached row or None; counts a hit or a miss."""
+        with self._lock:
+            row = self._rows.get(key)
+            if row is not None:
+                self._rows.move_to_end(key)
+                self.hits += 1
+                return row
+
+            self.misses += 1
+            return None
+
+    def store(self, key, row):
+        with self._lock:
+            self._rows[key] = row
+            self._rows.move_to_end(key)
+
+            while len(self._rows) > self.max_entries:
+                self._rows.popitem(last=False)
+
+    def get(self, key, compute):
+        row = self.lookup(key)
+        if row is None:
+            row = compute()
+            self.store(key, row)
+        return row
+
+    def invalidate(self, dataset_hash, column):
+        """Drop every entry of `dataset_hash` that reads `column`."""
+        with self._lock:
+            stale = [
+                key for key in self._rows
+                if key.dataset_hash == dataset_hash and column in key.columns
+            ]
+            for key in stale:
+                del self._rows[key]
+        return len(stale)
+
+    def info(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._rows)}
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from non_parametric_stats import format_ci
+from summary_stats import relative_impact_ci, welch_test
+
+
+# =====================================================
+# CUPED — PRE-PERIOD COVARIATE ADJUSTMENT
+# =====================================================
+def arm_moments(codes, y, x, arms, mask=None):
+    """Per-arm n, Σy, Σy², Σx, Σx², Σxy from one grouped pass (bincounts over codes)."""
+    w = None if mask is None else mask.astype(np.float64)
+
+    def total(values=None):
+        if values is None:
+            return np.bincount(codes, weights=w, minlength=arms)
+        return np.bincount(codes, weights=values if w is None else values * w, minlength=arms)
+
+    return {
+        "n": total(),
+        "y": total(y),
+        "yy": total(y * y),
+        "x": total(x),
+        "xx": total(x * x),
+        "xy": total(x * y),
+    }
+
+
+def cuped_theta(m):
+    """θ = pooled within-arm cov(y, x) / var(x), so treatment effects do not leak in."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sxy = m["xy"] - m["x"] * m["y"] / m["n"]
+        sxx = m["xx"] - m["x"] ** 2 / m["n"]
+    sxy, sxx = np.nansum(sxy), np.nansum(sxx)
+    return sxy / sxx if sxx > 0 else 0.0
+
+
+def adjusted_moments(m, theta):
+    """Per-arm mean and variance (ddof=1) of y - θ(x - mean x), plus the raw variance."""
+    n = m["n"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_y, mean_x = m["y"] / n, m["x"] / n
+        var_y = (m["yy"] - m["y"] * mean_y) / (n - 1)
+        var_x = (m["xx"] - m["x"] * mean_x) / (n - 1)
+        cov = (m["xy"] - m["x"] * mean_y) / (n - 1)
+
+    # Centred on the overall covariate mean, so the adjusted means stay on the metric's scale
+    grand_x = m["x"].sum() / n.sum()
+    mean_adj = mean_y - theta * (mean_x - grand_x)
+    var_adj = np.maximum(var_y - 2 * theta * cov + theta ** 2 * var_x, 0)
+
+    return mean_adj, var_adj, np.maximum(var_y, 0)
+
+
+def analyze_cuped(values, covariate, codes, labels, control, exclude_zeros=False, ci=0.95):
+    """Every variant vs `control` on the CUPED-adjusted metric.
+
+    `values` and `covariate` are row-aligned float arrays and `codes` the
+    arm of each row (e.g. from `VariantIndex`). One θ is estimated from all
+    arms; each arm's adjusted mean and variance follow from its sums, so
+    no adjusted column is materialized. With `exclude_zeros`, rows whose
+    metric is 0 are left out, as in the other analyses.
+    """
+    labels = [str(label) for label in labels]
+    c = labels.index(str(control))
+
+    mask = values != 0 if exclude_zeros else None
+    m = arm_moments(codes, values, covariate, len(labels), mask)
+    theta = cuped_theta(m)
+    mean, var, raw_var = adjusted_moments(m, theta)
+    n = m["n"]
+
+    others = [i for i in range(len(labels)) if i != c]
+    if not others:
+        return pd.DataFrame()
+    v = np.array(others)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        impact = np.where(mean[c] != 0, (mean[v] - mean[c]) / mean[c] * 100, np.nan)
+        raw_se = raw_var[c] / n[c] + raw_var[v] / n[v]
+        reduction = (1 - (var[c] / n[c] + var[v] / n[v]) / raw_se) * 100
+
+    low, high = relative_impact_ci(n[c], mean[c], var[c], n[v], mean[v], var[v], ci)
+
+    return pd.DataFrame({
+        "control": labels[c],
+        "variant": [labels[i] for i in others],
+        "nA": int(n[c]),
+        "nB": n[v].astype(np.int64),
+        "avgA": round(float(mean[c]), 2),
+        "avgB": np.round(mean[v], 2),
+        "impact": [f"{round(x, 1)}%" for x in impact],
+        "impact_ci": [format_ci(interval) for interval in zip(low, high)],
+        "p_value": np.round(welch_test(n[c], mean[c], var[c], n[v], mean[v], var[v]), 3),
+        "variance_reduction": np.round(reduction, 1),
+        "theta": round(float(theta), 4),
+    })
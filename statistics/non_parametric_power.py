@@ -0,0 +1,139 @@
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import stats
+
+# Values per (replicates x n) block handed to one vectorized mannwhitneyu call.
+BLOCK_VALUES = 2_000_000
+
+# Replicates per (lift, n) are split into this many seeded streams, whatever
+# the number of workers, so a power value does not depend on the machine.
+SHARES = 8
+
+# (dataset hash, lift, n, alpha, replicates, seed) -> power
+_power_cache = {}
+
+# Historical values of the current worker process (set by the initializer).
+_worker_values = None
+
+
+# =========================
+# HELPERS
+# =========================
+def dataset_hash(values):
+    values = np.ascontiguousarray(values, dtype=float)
+    return hashlib.blake2b(values.tobytes(), digest_size=16).hexdigest()
+
+
+def _seed_streams(seed, lift, n):
+    """SHARES independent streams derived from (seed, lift, n) only."""
+    lift_bits = int(np.float64(lift).view(np.uint64))
+    return np.random.SeedSequence([seed, lift_bits, int(n)]).spawn(SHARES)
+
+
+def _init_worker(values):
+    global _worker_values
+    _worker_values = values
+
+
+def _count_rejections(lift, n, alpha, replicates, seed_seq):
+    """
+    Run `replicates` Mann-Whitney tests on two arms of size `n` resampled
+    from the historical values, with the variant multiplied by (1 + lift).
+    Replicates are tested a block at a time with one vectorized call.
+    """
+    values = _worker_values
+    rng = np.random.default_rng(seed_seq)
+    rows = max(1, BLOCK_VALUES // n)
+
+    rejections = 0
+    done = 0
+    while done < replicates:
+        m = min(rows, replicates - done)
+        a = rng.choice(values, size=(m, n))
+        b = rng.choice(values, size=(m, n)) * (1 + lift)
+
+        _, p = stats.mannwhitneyu(a, b, alternative="two-sided", axis=1)
+        rejections += int(np.count_nonzero(p < alpha))
+        done += m
+
+    return rejections
+
+
+# =========================
+# POWER SIMULATION
+# =========================
+def power_curve(
+    values,
+    lifts,
+    sizes,
+    alpha=0.05,
+    replicates=2000,
+    workers=None,
+    seed=0,
+):
+    """Simulated Mann-Whitney power for every (lift, n per arm) combination.
+
+    Both arms are resampled with replacement from `values` (e.g. a
+    historical metric column, zeros included) and the variant gets a
+    multiplicative lift. Replicates are split into SHARES tasks per
+    combination, each with its own SeedSequence stream derived from
+    (seed, lift, n), and run over a process pool; a result therefore does
+    not depend on the other combinations or on `workers`. Results are
+    cached per (dataset hash, lift, n). Returns an array of shape (len(lifts), len(sizes)).
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    lifts = np.atleast_1d(lifts).astype(float)
+    sizes = np.atleast_1d(sizes).astype(int)
+
+    data_key = dataset_hash(values)
+    workers = workers or os.cpu_count() or 1
+
+    def key(lift, n):
+        return (data_key, float(lift), int(n), alpha, replicates, seed)
+
+    todo = [
+        (lift, n)
+        for lift in lifts
+        for n in sizes
+        if key(lift, n) not in _power_cache
+    ]
+
+    if todo:
+        # SHARES tasks per combination keep every core busy
+        shares = [len(s) for s in np.array_split(np.arange(replicates), SHARES)]
+        tasks = [
+            (lift, n, alpha, share, seed_seq)
+            for lift, n in todo
+            for share, seed_seq in zip(shares, _seed_streams(seed, lift, n))
+            if share
+        ]
+
+        if workers == 1:
+            _init_worker(values)
+            counts = [_count_rejections(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(values,),
+            ) as pool:
+                counts = list(pool.map(_count_rejections, *zip(*tasks)))
+
+        per_combination = sum(1 for share in shares if share)
+        for i, (lift, n) in enumerate(todo):
+            rejected = sum(counts[i * per_combination:(i + 1) * per_combination])
+            _power_cache[key(lift, n)] = rejected / replicates
+
+    return np.array([[_power_cache[key(lift, n)] for n in sizes] for lift in lifts])
+
+
+def simulate_power(values, lift, n, alpha=0.05, replicates=2000, workers=None, seed=0):
+    return float(power_curve(values, lift, n, alpha, replicates, workers, seed)[0, 0])
+
+
+def clear_power_cache():
+    _power_cache.clear()
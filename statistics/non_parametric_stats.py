@@ -1,6 +1,28 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
 import numpy as np
+import pandas as pd
 from scipy import stats
 
+from rank_stats import PooledRanks
+
+# Resampled counts held in memory per bootstrap block (replicates x distinct values).
+BOOTSTRAP_BLOCK = 2_000_000
+
+# Replicates are drawn in this many independent streams, whatever the number
+# of workers, so the CIs for a seed do not depend on the machine.
+BOOTSTRAP_SHARES = 8
+
+# Distinct values per row above which rows are resampled by index: one
+# multinomial draw costs several times more per category than drawing and
+# counting one row index.
+INDEX_RESAMPLE_RATIO = 1 / 3
+
+# Below this many distinct values (both arms) a process pool costs more than it saves.
+PARALLEL_MIN_VALUES = 100_000
+
 
 # =========================
 # CHECKS
@@ -24,71 +46,321 @@ def mann_whitney_test(sample_a, sample_b):
     return p
 
 
-# =====================================================
-# ANALYSIS — 0-WAARDES OPNEMEN
-# =====================================================
-def analyze_with_zeros(set_a, set_b, alpha=0.05):
-    """Compute statistics including any zero values present in the inputs.
+# =========================
+# BOOTSTRAP
+# =========================
+def _value_counts(sample):
+    x = np.asarray(sample, dtype=float)
+    return np.unique(x[~np.isnan(x)], return_counts=True)
+
+
+def _resample_counts(rng, counts, size, codes=None):
+    """`size` multinomial resamples of n rows, as counts per distinct value.
 
-    The arrays are used as-is; no preprocessing is performed.
+    With `codes` (the distinct-value code of every row) row indices are
+    drawn and counted with bincount, which is faster than `multinomial`
+    when nearly every value is distinct.
     """
-    avg_a = set_a.mean()
-    avg_b = set_b.mean()
-    med_a = set_a.median()
-    med_b = set_b.median()
+    n = int(counts.sum())
+    if codes is None:
+        return rng.multinomial(n, counts / n, size=size)
+
+    drawn = codes[rng.integers(0, n, size=(size, n))]
+    offsets = np.arange(size)[:, None] * counts.size
+    return np.bincount((drawn + offsets).ravel(), minlength=size * counts.size).reshape(size, -1)
+
+
+def _bootstrap_arm(values, counts, replicates, seed_seq):
+    """Bootstrap means and medians of one arm, given as distinct values + counts.
+
+    A resample of n rows is equivalent to multinomial counts over the
+    distinct values, so with repeated values each replicate costs
+    O(distinct values) instead of O(n). When most values are distinct
+    the counts come from resampled row indices instead. Replicates are
+    drawn a block at a time.
+    """
+    rng = np.random.default_rng(seed_seq)
+    n = int(counts.sum())
+    middle = ((n - 1) // 2, n // 2)
+
+    codes = None
+    if values.size > n * INDEX_RESAMPLE_RATIO:
+        codes = np.repeat(np.arange(values.size), counts)
+    rows = max(1, BOOTSTRAP_BLOCK // (values.size if codes is None else n))
 
-    impact_raw = (avg_b - avg_a) / avg_a if avg_a != 0 else np.nan
-    impact_pct = impact_raw * 100
-    p_value = mann_whitney_test(set_a, set_b)
+    means = np.empty(replicates)
+    medians = np.empty(replicates)
+
+    for start in range(0, replicates, rows):
+        stop = min(start + rows, replicates)
+        resampled = _resample_counts(rng, counts, stop - start, codes)
+
+        means[start:stop] = resampled @ values / n
+
+        cum = np.cumsum(resampled, axis=1)
+        lo = (cum <= middle[0]).sum(axis=1)
+        hi = (cum <= middle[1]).sum(axis=1)
+        medians[start:stop] = (values[lo] + values[hi]) / 2
+
+    return means, medians
+
+
+def bootstrap_impact_ci(set_a, set_b, replicates=2000, ci=0.95, workers=1, seed=0):
+    """Percentile bootstrap CIs for the mean and median impact (%) of B vs A.
+
+    Memory is bounded by the distinct values per arm plus one block of
+    resampled counts; `workers` > 1 (None: all CPUs) runs the
+    BOOTSTRAP_SHARES streams over processes once the arms are large
+    enough. Results depend only on `seed`, not on `workers`.
+    Returns {"mean": (low, high), "median": (low, high)}.
+    """
+    arms = [_value_counts(set_a), _value_counts(set_b)]
+    if any(values.size == 0 for values, _ in arms):
+        return {"mean": (np.nan, np.nan), "median": (np.nan, np.nan)}
+
+    workers = workers or os.cpu_count() or 1
+    if sum(values.size for values, _ in arms) < PARALLEL_MIN_VALUES:
+        workers = 1
+    shares = [len(s) for s in np.array_split(np.arange(replicates), BOOTSTRAP_SHARES) if len(s)]
+    seeds = iter(np.random.SeedSequence(seed).spawn(2 * len(shares)))
+    tasks = [(*arm, share, next(seeds)) for arm in arms for share in shares]
+
+    if workers == 1:
+        results = [_bootstrap_arm(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_bootstrap_arm, *zip(*tasks)))
+
+    k = len(shares)
+    mean_a, med_a = (np.concatenate(x) for x in zip(*results[:k]))
+    mean_b, med_b = (np.concatenate(x) for x in zip(*results[k:]))
+
+    tail = (1 - ci) / 2 * 100
+    with np.errstate(divide="ignore", invalid="ignore"):
+        impact_mean = (mean_b - mean_a) / mean_a * 100
+        impact_median = (med_b - med_a) / med_a * 100
 
     return {
-        "nA": len(set_a),
-        "nB": len(set_b),
-        "normalA": normality_check(set_a, alpha)[0],
-        "normalB": normality_check(set_b, alpha)[0],
-        "srm": srm_check(set_a, set_b, alpha),
-        "avgA": round(avg_a, 2),
-        "avgB": round(avg_b, 2),
-        "medA": round(med_a, 2),
-        "medB": round(med_b, 2),
-        "impact": f"{round(impact_pct, 1)}%",
-        "p_value": round(p_value, 3),
+        "mean": tuple(float(x) for x in np.nanpercentile(impact_mean, [tail, 100 - tail])),
+        "median": tuple(float(x) for x in np.nanpercentile(impact_median, [tail, 100 - tail])),
     }
 
 
+def format_ci(interval, decimals=1):
+    low, high = interval
+    return f"[{round(low, decimals)}%, {round(high, decimals)}%]"
+
+
+# =====================================================
+# ANALYSIS CORE
+# =====================================================
+@dataclass
+class ArmSummary:
+    n: int
+    mean: float
+    median: float
+    std: float
+    normality: str
+    normality_p: float
+
+
+@dataclass
+class AnalysisResult:
+    control: ArmSummary
+    variant: ArmSummary
+    srm: str
+    impact: float  # % change of the variant mean vs control
+    p_value: float
+    impact_ci: tuple = None
+    median_impact_ci: tuple = None
+
+    def as_dict(self):
+        """Flat, rounded view in the format the pages display."""
+        result = {
+            "nA": self.control.n,
+            "nB": self.variant.n,
+            "normalA": self.control.normality,
+            "normalB": self.variant.normality,
+            "srm": self.srm,
+            "avgA": round(self.control.mean, 2),
+            "avgB": round(self.variant.mean, 2),
+            "medA": round(self.control.median, 2),
+            "medB": round(self.variant.median, 2),
+            "impact": f"{round(self.impact, 1)}%",
+            "p_value": round(self.p_value, 3),
+        }
+        if self.impact_ci is not None:
+            result["impact_ci"] = format_ci(self.impact_ci)
+            result["median_impact_ci"] = format_ci(self.median_impact_ci)
+        return result
+
+
+def arm_values(sample, exclude_zeros=False):
+    """Contiguous float64 values of one arm.
+
+    Float64 input is used without copying; with `exclude_zeros` the
+    non-zero values are materialized once, and that buffer is owned by
+    the caller. The median and normality test need that copy anyway, and
+    masked reductions (`where=`) are several times slower than one copy.
+    """
+    x = np.ascontiguousarray(np.asarray(sample), dtype=float)
+    if exclude_zeros:
+        return x[x != 0], True
+    return x, False
+
+
+def summarize_arm(values, alpha=0.05, owned=False):
+    """Summary statistics of one arm's values.
+
+    When `owned` is True the median partitions `values` in place instead
+    of sorting a copy; the other statistics do not depend on order.
+    """
+    n = values.size
+    if n == 0:
+        return ArmSummary(0, np.nan, np.nan, np.nan, "too small", np.nan)
+
+    mean = float(values.mean())
+    std = float(values.std(ddof=1)) if n > 1 else np.nan
+    normality, normality_p = normality_check(values, alpha)
+    median = float(np.median(values, overwrite_input=owned))
+
+    return ArmSummary(n, mean, median, std, normality, normality_p)
+
+
+def analyze(
+    set_a, set_b, exclude_zeros=False, alpha=0.05, p_value=None, bootstrap=False, workers=1
+):
+    """Shared analysis engine for both zero-modes.
+
+    Each arm is converted to one contiguous float64 buffer (zero-exclusion
+    included) and every statistic — summaries, normality, SRM,
+    Mann-Whitney and the optional bootstrap CIs — reads that buffer.
+    A Mann-Whitney `p_value` computed elsewhere (e.g. by
+    `rank_stats.PooledRanks`) skips the test here. `workers` is passed
+    to `bootstrap_impact_ci`.
+    """
+    values_a, owned_a = arm_values(set_a, exclude_zeros)
+    values_b, owned_b = arm_values(set_b, exclude_zeros)
+
+    return _compare_arms(
+        values_a,
+        values_b,
+        summarize_arm(values_a, alpha, owned_a),
+        summarize_arm(values_b, alpha, owned_b),
+        alpha,
+        p_value,
+        bootstrap,
+        workers,
+    )
+
+
+def _compare_arms(values_a, values_b, control, variant, alpha, p_value, bootstrap, workers=1):
+    impact = (
+        (variant.mean - control.mean) / control.mean * 100
+        if control.mean != 0 else np.nan
+    )
+
+    if p_value is None:
+        p_value = mann_whitney_test(values_a, values_b)
+
+    result = AnalysisResult(
+        control=control,
+        variant=variant,
+        srm=srm_check(values_a, values_b, alpha),
+        impact=impact,
+        p_value=float(p_value),
+    )
+
+    if bootstrap:
+        ci = bootstrap_impact_ci(values_a, values_b, workers=workers)
+        result.impact_ci = ci["mean"]
+        result.median_impact_ci = ci["median"]
+
+    return result
+
+
+# =====================================================
+# ANALYSIS — 0-WAARDES OPNEMEN
+# =====================================================
+def analyze_with_zeros(set_a, set_b, alpha=0.05, p_value=None, bootstrap=False):
+    """Compute statistics including any zero values present in the inputs."""
+    return analyze(set_a, set_b, False, alpha, p_value, bootstrap).as_dict()
+
+
 # =====================================================
 # ANALYSIS — 0-WAARDES UITSLUITEN
 # =====================================================
-def analyze_no_zeros(set_a, set_b, alpha=0.05):
-    """Analyse samples that should already have zeroes removed.
+def analyze_no_zeros(set_a, set_b, alpha=0.05, p_value=None, bootstrap=False):
+    """Compute statistics with zero values excluded from both inputs."""
+    return analyze(set_a, set_b, True, alpha, p_value, bootstrap).as_dict()
+
 
-    The calling page applies `get_sample` before invoking this
-    function, so no further filtering occurs here.  Behaviour mirrors
-    `analyze_with_zeros` for consistency.
+# =====================================================
+# BATCH — ALLE METRICS × VARIANTEN
+# =====================================================
+def analyze_batch(
+    values,
+    codes,
+    bounds,
+    labels,
+    control,
+    exclude_zeros=False,
+    alpha=0.05,
+    bootstrap=False,
+    ranks=None,
+    workers=1,
+):
+    """Analyse every metric for every variant against one control.
+
+    Rows are expected grouped by arm, as `data/variant_index.VariantIndex`
+    keeps them: `values` maps each metric to its values in arm order,
+    `codes` is the (sorted) arm of every row, `bounds[i]:bounds[i + 1]` the
+    rows of `labels[i]`. Each arm is then a slice and no column is
+    factorized or sorted again here. `ranks` optionally maps a metric to an
+    already built PooledRanks over the same codes; otherwise one is built
+    per metric. `workers` is passed to the bootstrap, if any. Returns one
+    row per metric × variant with the
+    `AnalysisResult.as_dict()` fields plus the standard deviations.
     """
+    labels = [str(label) for label in labels]
+    control = str(control)
+    c = labels.index(control)
+    ranks = ranks or {}
 
-    set_a = np.array(set_a, dtype=float)
-    set_b = np.array(set_b, dtype=float)
+    rows = []
+    for metric, metric_values in values.items():
+        engine = ranks.get(metric)
+        if engine is None:
+            engine = PooledRanks.from_codes(metric_values, codes, labels, exclude_zeros)
 
-    avg_a = np.mean(set_a)
-    avg_b = np.mean(set_b)
-    med_a = np.median(set_a)
-    med_b = np.median(set_b)
+        arms = [
+            arm_values(metric_values[bounds[i]:bounds[i + 1]], exclude_zeros)
+            for i in range(len(labels))
+        ]
+        summaries = [summarize_arm(arm, alpha, owned) for arm, owned in arms]
 
-    impact_raw = (avg_b - avg_a) / avg_a if avg_a != 0 else np.nan
-    impact_pct = impact_raw * 100
-    p_value = mann_whitney_test(set_a, set_b)
+        for i, label in enumerate(labels):
+            if i == c:
+                continue
 
-    return {
-        "nA": len(set_a),
-        "nB": len(set_b),
-        "normalA": normality_check(set_a, alpha)[0],
-        "normalB": normality_check(set_b, alpha)[0],
-        "srm": srm_check(set_a, set_b, alpha),
-        "avgA": round(avg_a, 2),
-        "avgB": round(avg_b, 2),
-        "medA": round(med_a, 2),
-        "medB": round(med_b, 2),
-        "impact": f"{round(impact_pct, 1)}%",
-        "p_value": round(p_value, 3),
-    }
\ No newline at end of file
+            result = _compare_arms(
+                arms[c][0],
+                arms[i][0],
+                summaries[c],
+                summaries[i],
+                alpha,
+                engine.compare(control, label)["p_value"],
+                bootstrap,
+                workers,
+            )
+
+            rows.append({
+                "metric": metric,
+                "control": control,
+                "variant": label,
+                **result.as_dict(),
+                "stdA": round(result.control.std, 2),
+                "stdB": round(result.variant.std, 2),
+            })
+
+    return pd.DataFrame(rows)
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Below this arm size scipy's exact Mann-Whitney distribution is used.
+EXACT_MAX_N = 8
+
+
+# =========================
+# POOLED RANK ENGINE
+# =========================
+class PooledRanks:
+    """Mann-Whitney U for any pair of arms from one sort of the metric column.
+
+    The column is sorted once by (arm, value). Every arm is then a sorted
+    slice whose tie groups (distinct values and counts) are computed once,
+    so U and the tie-corrected variance of any control/variant pair follow
+    from one searchsorted over the two arms' distinct values, without
+    sorting again.
+    """
+
+    def __init__(self, values, labels, exclude_zeros=False):
+        codes, uniques = pd.factorize(np.asarray(labels).astype(str), sort=True)
+        self._build(values, codes, np.asarray(uniques), exclude_zeros)
+
+    @classmethod
+    def from_codes(cls, values, codes, labels, exclude_zeros=False):
+        """Build from an already factorized arm column (codes index `labels`)."""
+        engine = cls.__new__(cls)
+        engine._build(values, np.asarray(codes), np.asarray(labels).astype(str), exclude_zeros)
+        return engine
+
+    def _build(self, values, codes, labels, exclude_zeros):
+        values = np.asarray(values, dtype=float)
+
+        keep = ~np.isnan(values)
+        if exclude_zeros:
+            keep &= values != 0
+        values = values[keep]
+
+        self.labels = labels
+        codes = codes[keep]
+
+        order = np.lexsort((values, codes))
+        self.values = values[order]
+        self.bounds = np.searchsorted(codes[order], np.arange(len(self.labels) + 1))
+
+        self._index = {label: i for i, label in enumerate(self.labels)}
+        self._ties = {}
+
+    def arm(self, label):
+        """Sorted values of one arm (a view, no copy)."""
+        i = self._index[str(label)]
+        return self.values[self.bounds[i]:self.bounds[i + 1]]
+
+    def tie_groups(self, label):
+        """Distinct values and their counts for one arm (cached)."""
+        label = str(label)
+        if label not in self._ties:
+            x = self.arm(label)
+            starts = np.flatnonzero(np.r_[True, x[1:] != x[:-1]])
+            counts = np.diff(np.r_[starts, x.size])
+            self._ties[label] = (x[starts], counts)
+        return self._ties[label]
+
+    def compare(self, control, variant):
+        """Two-sided Mann-Whitney test of control vs variant.
+
+        Matches scipy.stats.mannwhitneyu(control, variant): the normal
+        approximation with tie and continuity correction, or the exact
+        distribution for small tie-free arms.
+        """
+        a = self.arm(control)
+        b = self.arm(variant)
+        na, nb = a.size, b.size
+
+        if na == 0 or nb == 0:
+            return {"U": np.nan, "z": np.nan, "p_value": np.nan, "nA": na, "nB": nb}
+
+        va, ca = self.tie_groups(control)
+        vb, cb = self.tie_groups(variant)
+
+        # For every distinct control value: #variant values below it and tied with it
+        pos = np.searchsorted(vb, va)
+        hit = pos.clip(max=vb.size - 1)
+        below = np.r_[0, np.cumsum(cb)][pos]
+        tied = np.where(vb[hit] == va, cb[hit], 0)
+
+        u = float(np.sum(ca * (below + 0.5 * tied)))
+
+        # Sum of t^3 - t over the tie groups of the pooled pair
+        ca_f = ca.astype(float)
+        cb_f = cb.astype(float)
+        tied_f = tied.astype(float)
+        ties = float(
+            np.sum(ca_f ** 3) + np.sum(cb_f ** 3)
+            + np.sum(3 * ca_f * tied_f * (ca_f + tied_f))
+            - (na + nb)
+        )
+
+        if min(na, nb) <= EXACT_MAX_N and ties == 0:
+            _, p = stats.mannwhitneyu(a, b, alternative="two-sided")
+            return {"U": u, "z": np.nan, "p_value": float(p), "nA": na, "nB": nb}
+
+        n = na + nb
+        mu = na * nb / 2
+        sigma = np.sqrt(na * nb / 12 * ((n + 1) - ties / (n * (n - 1))))
+
+        if sigma == 0:
+            return {"U": u, "z": np.nan, "p_value": 1.0, "nA": na, "nB": nb}
+
+        z = (max(u, na * nb - u) - mu - 0.5) / sigma
+        p = min(2 * stats.norm.sf(z), 1.0)
+
+        return {"U": u, "z": float(z), "p_value": float(p), "nA": na, "nB": nb}
+
+    def compare_all(self, control):
+        """Compare every other arm against a shared control."""
+        return {
+            label: self.compare(control, label)
+            for label in self.labels
+            if label != str(control)
+        }
+
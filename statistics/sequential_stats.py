@@ -0,0 +1,136 @@
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pandas as pd
+
+from summary_stats import moments
+
+
+# =====================================================
+# mSPRT — ALWAYS-VALID P-VALUES / CONFIDENCE SEQUENCES
+# =====================================================
+def msprt_statistics(n_a, mean_a, var_a, n_b, mean_b, var_b, tau, alpha=0.05):
+    """Mixture likelihood ratio and confidence sequence for mean_b - mean_a.
+
+    Uses the normal-mixture mSPRT (mixing distribution N(0, tau²) on the
+    difference) with the plug-in variance V = var_a/n_a + var_b/n_b. The
+    confidence sequence is every difference whose likelihood ratio stays
+    below 1/alpha. Vectorized over experiments.
+    Returns (likelihood ratio, low, high).
+    """
+    tau2 = np.asarray(tau, dtype=np.float64) ** 2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        v = var_a / n_a + var_b / n_b
+        diff = mean_b - mean_a
+
+        ratio = np.sqrt(v / (v + tau2)) * np.exp(diff ** 2 * tau2 / (2 * v * (v + tau2)))
+        half = np.sqrt(v * (v + tau2) / tau2 * (np.log((v + tau2) / v) + 2 * np.log(1 / alpha)))
+
+    # No variance estimate yet (fewer than 2 values per arm): nothing learned
+    undefined = ~np.isfinite(half)
+    ratio = np.where(undefined, 1.0, ratio)
+    half = np.where(undefined, np.inf, half)
+
+    return ratio, diff - half, diff + half
+
+
+@dataclass(frozen=True)
+class SequentialState:
+    """Running totals and always-valid results of one or many experiments.
+
+    Fields are scalars or equally shaped arrays (one element per
+    experiment). `update` folds in one day of count/sum/sum_sq per arm in
+    O(1) per experiment: the cumulative statistics are added to, the
+    p-value is the running minimum of 1/likelihood ratio and the
+    confidence sequence is the running intersection.
+    """
+    tau: object
+    alpha: float = 0.05
+    days: int = 0
+    n_a: object = 0.0
+    sum_a: object = 0.0
+    sum_sq_a: object = 0.0
+    n_b: object = 0.0
+    sum_b: object = 0.0
+    sum_sq_b: object = 0.0
+    p_value: object = 1.0
+    ci_low: object = -np.inf
+    ci_high: object = np.inf
+
+    def update(self, day_a, day_b):
+        """New state after one day; `day_a`/`day_b` are (count, sum, sum_sq)."""
+        n_a, sum_a, sum_sq_a = (self.n_a + day_a[0], self.sum_a + day_a[1], self.sum_sq_a + day_a[2])
+        n_b, sum_b, sum_sq_b = (self.n_b + day_b[0], self.sum_b + day_b[1], self.sum_sq_b + day_b[2])
+
+        mean_a, var_a = moments(n_a, sum_a, sum_sq_a)
+        mean_b, var_b = moments(n_b, sum_b, sum_sq_b)
+        ratio, low, high = msprt_statistics(
+            n_a, mean_a, var_a, n_b, mean_b, var_b, self.tau, self.alpha
+        )
+
+        return replace(
+            self,
+            days=self.days + 1,
+            n_a=n_a, sum_a=sum_a, sum_sq_a=sum_sq_a,
+            n_b=n_b, sum_b=sum_b, sum_sq_b=sum_sq_b,
+            p_value=np.minimum(self.p_value, np.minimum(1.0, 1 / ratio)),
+            ci_low=np.maximum(self.ci_low, low),
+            ci_high=np.minimum(self.ci_high, high),
+        )
+
+    @property
+    def estimate(self):
+        mean_a, _ = moments(self.n_a, self.sum_a, self.sum_sq_a)
+        mean_b, _ = moments(self.n_b, self.sum_b, self.sum_sq_b)
+        return mean_b - mean_a
+
+    @property
+    def significant(self):
+        return self.p_value < self.alpha
+
+
+# =========================
+# TRAJECTORY
+# =========================
+def trajectory(daily, control, tau, alpha=0.05):
+    """Day-by-day always-valid results of every variant vs `control`.
+
+    `daily` has one row per (day, variant) with count/sum/sum_sq for a
+    single metric (see `data/sufficient_stats.py`). All variants are
+    updated together, one vectorized `SequentialState.update` per day.
+    Returns one row per (day, variant) with the cumulative samples, the
+    estimated difference, the confidence sequence and the p-value.
+    """
+    control = str(control)
+    daily = daily.assign(variant=daily["variant"].astype(str))
+
+    wide = daily.pivot_table(
+        index="day", columns="variant", values=["count", "sum", "sum_sq"],
+        aggfunc="sum", fill_value=0,
+    ).sort_index()
+
+    variants = [v for v in wide["count"].columns if v != control]
+    if control not in wide["count"].columns or not variants:
+        return pd.DataFrame()
+
+    state = SequentialState(tau=tau, alpha=alpha)
+    rows = []
+
+    for day in wide.index:
+        day_a = [wide.loc[day, (s, control)] for s in ("count", "sum", "sum_sq")]
+        day_b = [wide.loc[day, [(s, v) for v in variants]].to_numpy() for s in ("count", "sum", "sum_sq")]
+        state = state.update(day_a, day_b)
+
+        rows.append(pd.DataFrame({
+            "day": day,
+            "variant": variants,
+            "nA": np.broadcast_to(state.n_a, len(variants)),
+            "nB": state.n_b,
+            "estimate": state.estimate,
+            "ci_low": state.ci_low,
+            "ci_high": state.ci_high,
+            "p_value": state.p_value,
+        }))
+
+    return pd.concat(rows, ignore_index=True)
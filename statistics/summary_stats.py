@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from Bayesian_stats import prob_variant_beats_control_batch
+from non_parametric_stats import format_ci
+
+
+# =========================
+# MOMENTS
+# =========================
+def moments(count, total, total_sq):
+    """Mean and sample variance (ddof=1) from count, sum and sum of squares."""
+    count = np.asarray(count, dtype=np.float64)
+    total = np.asarray(total, dtype=np.float64)
+    total_sq = np.asarray(total_sq, dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / count
+        # Clipped at 0: cancellation can leave tiny negatives for constant data
+        var = np.maximum(total_sq - total * mean, 0) / (count - 1)
+
+    return mean, var
+
+
+def is_binary(count, total, total_sq):
+    """True where the statistics can only come from 0/1 values."""
+    total = np.asarray(total, dtype=np.float64)
+    return (
+        np.isclose(np.asarray(total_sq, dtype=np.float64), total)
+        & (total >= 0)
+        & (total <= np.asarray(count, dtype=np.float64))
+    )
+
+
+# =========================
+# TESTS
+# =========================
+def welch_test(n_a, mean_a, var_a, n_b, mean_b, var_b):
+    """Two-sided Welch t-test p-values, vectorized over pairs."""
+    se_a = np.asarray(var_a) / np.asarray(n_a)
+    se_b = np.asarray(var_b) / np.asarray(n_b)
+    se = se_a + se_b
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (np.asarray(mean_b) - np.asarray(mean_a)) / np.sqrt(se)
+        df = se ** 2 / (se_a ** 2 / (np.asarray(n_a) - 1) + se_b ** 2 / (np.asarray(n_b) - 1))
+
+    return 2 * stats.t.sf(np.abs(t), df)
+
+
+def relative_impact_ci(n_a, mean_a, var_a, n_b, mean_b, var_b, ci=0.95):
+    """Delta-method CI (in %) of mean_b / mean_a - 1."""
+    z = stats.norm.ppf(1 - (1 - ci) / 2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = mean_b / mean_a
+        se = np.sqrt(var_b / (n_b * mean_a ** 2) + ratio ** 2 * var_a / (n_a * mean_a ** 2))
+
+    return (ratio - 1 - z * se) * 100, (ratio - 1 + z * se) * 100
+
+
+def srm_from_counts(n_a, n_b, alpha=0.05):
+    _, p = stats.chisquare([n_a, n_b])
+    return "SRM mismatch" if p < alpha else "OK"
+
+
+# =========================
+# ANALYSIS
+# =========================
+def analyze_summary(frame, control, alpha=0.05, ci=0.95):
+    """Every variant vs `control`, per metric, from sufficient statistics only.
+
+    `frame` has one row per (metric, variant) with count/sum/sum_sq (see
+    `data/sufficient_stats.py`). Means are compared with a Welch t-test;
+    metrics whose statistics are 0/1 also get P(variant > control) from
+    the Beta-Binomial posterior, all pairs in one batched call. Rank-based
+    tests need the raw values and are not available here.
+    """
+    control = str(control)
+    frame = frame.assign(variant=frame["variant"].astype(str))
+
+    base = frame.loc[frame["variant"] == control, ["metric", "count", "sum", "sum_sq"]]
+    pairs = frame[frame["variant"] != control].merge(
+        base, on="metric", suffixes=("_v", "_c")
+    )
+
+    columns = [
+        "metric", "control", "variant", "nA", "nB", "avgA", "avgB",
+        "stdA", "stdB", "srm", "impact", "impact_ci", "p_value", "p_beat",
+    ]
+    if pairs.empty:
+        return pd.DataFrame(columns=columns)
+
+    n_a, n_b = pairs["count_c"].to_numpy(), pairs["count_v"].to_numpy()
+    mean_a, var_a = moments(n_a, pairs["sum_c"], pairs["sum_sq_c"])
+    mean_b, var_b = moments(n_b, pairs["sum_v"], pairs["sum_sq_v"])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        impact = np.where(mean_a != 0, (mean_b - mean_a) / mean_a * 100, np.nan)
+    low, high = relative_impact_ci(n_a, mean_a, var_a, n_b, mean_b, var_b, ci)
+
+    binary = (
+        is_binary(n_a, pairs["sum_c"], pairs["sum_sq_c"])
+        & is_binary(n_b, pairs["sum_v"], pairs["sum_sq_v"])
+    )
+    p_beat = np.full(len(pairs), np.nan)
+    if binary.any():
+        p_beat[binary] = prob_variant_beats_control_batch(
+            np.rint(pairs["sum_c"].to_numpy()[binary]).astype(np.int64),
+            n_a[binary].astype(np.int64),
+            np.rint(pairs["sum_v"].to_numpy()[binary]).astype(np.int64),
+            n_b[binary].astype(np.int64),
+        )
+
+    return pd.DataFrame({
+        "metric": pairs["metric"],
+        "control": control,
+        "variant": pairs["variant"],
+        "nA": n_a.astype(np.int64),
+        "nB": n_b.astype(np.int64),
+        "avgA": np.round(mean_a, 2),
+        "avgB": np.round(mean_b, 2),
+        "stdA": np.round(np.sqrt(var_a), 2),
+        "stdB": np.round(np.sqrt(var_b), 2),
+        "srm": [srm_from_counts(a, b, alpha) for a, b in zip(n_a, n_b)],
+        "impact": [f"{round(x, 1)}%" for x in impact],
+        "impact_ci": [format_ci(interval) for interval in zip(low, high)],
+        "p_value": np.round(welch_test(n_a, mean_a, var_a, n_b, mean_b, var_b), 3),
+        "p_beat": np.round(p_beat, 4),
+    })